@@ -15,14 +15,20 @@
 
 import io
 import logging
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import cached_property
 from typing import Union
 
+import lxml.html
 import numpy as np
+from lxml import etree
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter, Retry
+from bs4 import BeautifulSoup, SoupStrainer
 
 from data.Config import Config
 from data.helpfunctions import remove_duplicates
@@ -32,6 +38,28 @@ class BVVScalper:
 
     _ENCODING = "utf-8"
 
+    _WAITING_RE = re.compile(r'Warteliste \((\d+)\)')
+
+    # level before the first hyphen, course type anywhere after it, optional trailing mode parenthesis
+    _SECTION_RE = re.compile(
+        r'^(?:Beach )?(?P<license_type>[^-]*)-'
+        r'(?:.*?(?P<course_type>Ausbildung|Fortbildung))?'
+        r'(?:.*\((?P<mode>Theorie und Praxis|Theorie \+ Praxis|Theorie|Praxis)\)?$)?'
+    )
+    _SECTION_MODE_SUFFIX = {"Theorie": "T", "Praxis": "P"}
+
+    # "01.01.2022 - 31.12.2023": only the first two " - " separated parts matter
+    _PERIOD_RE = re.compile(r'^(?P<start>.*?) - (?P<end>.*?)(?: - .*)?$')
+
+    # links of the first portaltable following the section header on a person search result page
+    _USER_LINK_XPATH = etree.XPath(
+        "//div[@class='sectionheader']/following::table[@class='portaltable'][1]//a/@href")
+
+    _USERID_RE = re.compile(r'[?&]userid=([^&#]+)')
+
+    # the birthday cell has no label id of its own, it is the second td after the sex label
+    _BIRTHDAY_XPATH = etree.XPath("following::td[2]")
+
     __json_section = ["bvv_settings"]
     __json_username = __json_section + ["username"]
     __json_password = __json_section + ["password"]
@@ -61,6 +89,15 @@ class BVVScalper:
         self.url_registration_get = "https://bvv.volley.de/portal/sw_verein_anmeldungen!browse.action?vereinsid=" + self.club_id
         self.url_registration_action = "https://bvv.volley.de/portal/sw_verein_anmeldungen.action"
 
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32,
+                              max_retries=Retry(total=2, backoff_factor=0.2))
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update({"Connection": "keep-alive",
+                                      "Accept-Encoding": "gzip, deflate, br"})
+        self._logged_in = False
+
         self._scalped_registrations_content = None
         self._scalped_licenses_content = None
         self._scalped_licenses_excel = None
@@ -69,23 +106,63 @@ class BVVScalper:
 
     def _login(self):
         """
-        Creates a session and logs into bvv portal homepage.
-        :return: session object. IMPORTANT: Session must be closed using session.close() (or with block)
+        Logs the pooled session into bvv portal homepage (no-op if already logged in).
+        :return: the shared session object. It is kept open for connection reuse, see close().
         """
-        payload = {"username": self.username,
-                   "password": self.password}
-        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-        session = requests.session()
-        session.post(self.url_login, data=payload, headers=headers)  # login
-        logging.info("BVV_SCALPER: logged into BVV site.")
-        return session
+        if not self._logged_in:
+            payload = {"username": self.username,
+                       "password": self.password}
+            headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+            self._session.post(self.url_login, data=payload, headers=headers)  # login
+            self._logged_in = True
+            logging.info("BVV_SCALPER: logged into BVV site.")
+        return self._session
 
     def _logout(self, session):
+        self._logged_in = False
         response = session.post(self.url_logout)
         if response.status_code != 200:
             logging.error("BVV_SCALPER: response failed for logout")
             return None
 
+    def close(self):
+        """
+        Closes the pooled session (logs out first if necessary).
+        :return: None
+        """
+        if self._logged_in:
+            self._logout(self._session)
+        self._session.close()
+
+    def __enter__(self):
+        self._login()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @classmethod
+    def _parse_html(cls, content):
+        """
+        Parses raw response bytes into an lxml document tree.
+        :param content: raw html bytes as returned by the portal
+        :return: lxml.html root element
+        """
+        return lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding=cls._ENCODING))
+
+    @cached_property
+    def _registrations_tree(self):
+        return self._parse_html(self._scalped_registrations_content)
+
+    @cached_property
+    def _licenses_tree(self):
+        return self._parse_html(self._scalped_licenses_content)
+
+    @cached_property
+    def _courses_tree(self):
+        return self._parse_html(self._scalped_courses_content)
+
     def _request_timing(self):
         """
         Delays the request by __request_delay, should be executed before the actual request.
@@ -95,14 +172,22 @@ class BVVScalper:
         return
 
     def _scalp_data(self):
-        with self._login() as session:
-            self._request_timing()
-            self._scalped_registrations_content = self._scalp_current_registrations(session)
-            self._scalped_licenses_content = self._scalp_licenses(session)
-            self._scalped_licenses_excel = self._scalp_licenses_excel(session)
-            self._scalped_courses_content = self._scalp_courses(session)
-            self._request_timing()
-            self._logout(session)
+        session = self._login()
+        self._request_timing()
+        # the four portal pages are independent, fetch them concurrently
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            registrations = executor.submit(self._scalp_current_registrations, session)
+            licenses = executor.submit(self._scalp_licenses, session)
+            licenses_excel = executor.submit(self._scalp_licenses_excel, session)
+            courses = executor.submit(self._scalp_courses, session)
+        self._scalped_registrations_content = registrations.result()
+        self._scalped_licenses_content = licenses.result()
+        self._scalped_licenses_excel = licenses_excel.result()
+        self._scalped_courses_content = courses.result()
+        # drop any lazily parsed trees of the previous scalp
+        for cached_tree in ("_registrations_tree", "_licenses_tree", "_courses_tree"):
+            self.__dict__.pop(cached_tree, None)
+        self._logout(session)
         return
 
     # =================================================================================================================
@@ -125,7 +210,7 @@ class BVVScalper:
         df = self._fetch_current_registrations(start=start, end=end)
 
         # converting birthday to datetime
-        df['birthday'] = pd.to_datetime(df['birthday'], format=self.bvv_date_format)
+        df['birthday'] = pd.to_datetime(df['birthday'], format=self.bvv_date_format, cache=True)
 
         # transform values of participation_status
         participation_mapping = {
@@ -137,57 +222,60 @@ class BVVScalper:
         }
         df['participation_status'] = df['participation_status'].map(participation_mapping)
 
-        # transform values of registration_status
-        registration_mapping = {
-            'zugelassen': 'approved',
-            'storniert (kostenfrei)': 'cancelled',
-            'ohne Anmeldung': 'approved'
-        }
-        df['registration_status'] = df['registration_status'].replace(registration_mapping)
-
-        # Extract waiting_position for "Warteliste (digit)" patterns
-        df['waiting_position'] = df['registration_status'].str.extract(r'Warteliste \((\d+)\)')
-        # Replace "Warteliste (digit)" with "waiting" in registration_status
-        df.loc[df['registration_status'].str.contains('Warteliste'), 'registration_status'] = 'waiting'
-
-        # Convert waiting_position to numeric (float or int), conversion fail or missing values will result in NaN
-        df['waiting_position'] = pd.to_numeric(df['waiting_position'], errors='coerce')
-
-        # Any non-waiting has waiting_position 0
-        df.loc[df['registration_status'] != 'waiting', "waiting_position"] = 0
+        # Extract waiting_position for "Warteliste (digit)" patterns in a single regex pass
+        waiting_position = df['registration_status'].str.extract(self._WAITING_RE, expand=False)
+        is_waiting = df['registration_status'].str.contains('Warteliste', regex=False)
+
+        # transform values of registration_status in one vectorized pass
+        status = df['registration_status']
+        df['registration_status'] = np.select(
+            [is_waiting,
+             status == 'zugelassen',
+             status == 'storniert (kostenfrei)',
+             status == 'ohne Anmeldung'],
+            ['waiting', 'approved', 'cancelled', 'approved'],
+            default=status)
+
+        # Convert waiting_position to numeric, any non-waiting has waiting_position 0
+        df['waiting_position'] = pd.to_numeric(waiting_position, errors='coerce').where(is_waiting, 0)
         return df
 
     def _fetch_current_registrations(self, start: datetime, end: datetime):
-        soup = BeautifulSoup(self._scalped_registrations_content, 'html.parser')
-        rows = soup.find('table').find_all('tr')
+        table = self._registrations_tree.find('.//table')
+        rows = table.findall('.//tr')
 
-        if rows and "keine Anmeldungen für Lehrgänge im angegebenen Zeitraum gefunden" in rows[0].get_text():
+        if rows and "keine Anmeldungen für Lehrgänge im angegebenen Zeitraum gefunden" in rows[0].text_content():
             logging.warning(f"BVV_SCALPER: fetch_current_registrations could not find any courses between {start} and {end}")
             return None
 
-        data = []
+        # collect one list per column so the DataFrame is built without a per-row dict pass
+        course_labels, last_names, first_names = [], [], []
+        birthdays, registration_statuses, participation_statuses = [], [], []
         current_course_label = None
 
-        for row in rows:
-            columns = row.find_all('td')
-            headers = row.find_all('th')
-
-            if headers and 2 < len(headers) < 6:
-                current_course_label = headers[1].get_text()
+        # preselect course header rows and registration rows in one xpath pass (document order)
+        for row in table.xpath('.//tr[(count(th) > 2 and count(th) < 6) or count(td) >= 6]'):
+            headers = row.findall('th')
+            if headers:
+                current_course_label = headers[1].text_content()
                 continue
 
-            if columns and len(columns) >= 6:
-                entry = {
-                    "course_label": current_course_label,
-                    "last_name": columns[0].get_text(),
-                    "first_name": columns[1].get_text(),
-                    "birthday": columns[2].get_text(),
-                    "registration_status": columns[4].get_text(),
-                    "participation_status": columns[5].get_text()
-                }
-                data.append(entry)
-        logging.info(f"BVV_SCALPER: fetched current registrations between {start} and {end} (count = {len(data)}")
-        return pd.DataFrame(data)
+            columns = row.findall('td')
+            course_labels.append(current_course_label)
+            last_names.append(columns[0].text_content())
+            first_names.append(columns[1].text_content())
+            birthdays.append(columns[2].text_content())
+            registration_statuses.append(columns[4].text_content())
+            participation_statuses.append(columns[5].text_content())
+        logging.info(f"BVV_SCALPER: fetched current registrations between {start} and {end} (count = {len(course_labels)}")
+        return pd.DataFrame({
+            "course_label": course_labels,
+            "last_name": last_names,
+            "first_name": first_names,
+            "birthday": birthdays,
+            "registration_status": registration_statuses,
+            "participation_status": participation_statuses
+        })
 
     def _scalp_current_registrations(self, session, start=None, end=None):
         self._request_timing()
@@ -213,8 +301,7 @@ class BVVScalper:
             logging.error("BVV_SCALPER: response failed for fetch_current_registrations ")
             return None
 
-        response.encoding = BVVScalper._ENCODING
-        return response.text
+        return response.content
 
     # =================================================================================================================
     #      LICENSES
@@ -229,6 +316,14 @@ class BVVScalper:
         direct_licenses = self._fetch_licenses()
         excel_licenses = self._download_licenses()
 
+        # names repeat across both sources, so share one categorical dtype per column and let
+        # the duplicate handling and the merge below compare integer codes instead of strings
+        for column in ("last_name", "first_name"):
+            shared = pd.concat([direct_licenses[column], excel_licenses[column]], ignore_index=True)
+            name_dtype = pd.CategoricalDtype(shared.dropna().unique())
+            direct_licenses[column] = direct_licenses[column].astype(name_dtype)
+            excel_licenses[column] = excel_licenses[column].astype(name_dtype)
+
         # remove possible duplicates based on completeness
         direct_licenses = remove_duplicates(direct_licenses, subset=["last_name", "first_name"])
         excel_licenses = remove_duplicates(excel_licenses, subset=["last_name", "first_name", "birthday"])
@@ -240,16 +335,14 @@ class BVVScalper:
         # transform dates
         date_columns = ["license_since", "license_expire"]
         for column in date_columns:
-            direct_licenses[column] = pd.to_datetime(direct_licenses[column], format=self.bvv_date_format)
-            excel_licenses[column] = pd.to_datetime(excel_licenses[column], format=self.local_date_format)
-        excel_licenses["birthday"] = pd.to_datetime(excel_licenses["birthday"], format=self.local_date_format)
-
-        # not specifying on-param will lead to intersection of columns
-        merged_df = excel_licenses.merge(right=direct_licenses, how="left", suffixes=("", "_right"))
+            direct_licenses[column] = pd.to_datetime(direct_licenses[column], format=self.bvv_date_format, cache=True)
+            excel_licenses[column] = pd.to_datetime(excel_licenses[column], format=self.local_date_format, cache=True)
+        excel_licenses["birthday"] = pd.to_datetime(excel_licenses["birthday"], format=self.local_date_format, cache=True)
 
-        # only keep data from Excel and license_bvv_id
-        cols_to_drop = [col for col in merged_df.columns if col.endswith('_right')]
-        df = merged_df.drop(cols_to_drop, axis=1)
+        # only license_bvv_id is needed from the direct page, so merge a slim frame on the name keys
+        # instead of joining on every shared column and dropping the suffixed leftovers
+        direct_slim = direct_licenses[["last_name", "first_name", "license_bvv_id"]]
+        df = excel_licenses.merge(right=direct_slim, how="left", on=["last_name", "first_name"])
 
         # transform sex
         sex_mapping = {
@@ -265,57 +358,47 @@ class BVVScalper:
         return df
 
     def _fetch_licenses(self):
-        content = self._scalped_licenses_content
-        soup = BeautifulSoup(content, 'html.parser')
-
         # Find the form by ID
-        form = soup.find('form', {'id': 'sw_verein_lehrgangsanmeldunginit'})
+        form = self._licenses_tree.find('.//form[@id="sw_verein_lehrgangsanmeldunginit"]')
 
         # Find the nested table within the form
-        tables = form.find_all('table')
+        tables = form.findall('.//table')
         table = tables[-1]
 
         # Get all rows except the header
-        rows = table.find_all('tr')[2:]
+        rows = table.findall('.//tr')[2:]
 
-        # List to store all entries
-        entries = []
+        # collect one list per column so the DataFrame is built without a per-row dict pass
+        columns = {name: [] for name in ('last_name', 'first_name', 'license_category', 'license_type',
+                                         'license_id', 'license_bvv_id', 'license_since', 'license_expire', 'club')}
 
         for row in rows:
-            cells = row.find_all('td')
+            cells = row.findall('td')
 
             # Get license_bvv_id from the checkbox input's name attribute
-            element = row.find('input', type='checkbox')
-            if element:
-                internal_license_id = element['name'].split('[')[1].split(']')[0]
+            element = row.find('.//input[@type="checkbox"]')
+            if element is not None:
+                internal_license_id = element.get('name').split('[')[1].split(']')[0]
             else:
                 # Handle the case where the element was not found
-                logging.error(f"BVV_SCALPER: Did not find a checkbox for {row}")
+                logging.error(f"BVV_SCALPER: Did not find a checkbox for {lxml.html.tostring(row)}")
                 continue
 
             # license_parts "Halle C", "Beach C"...
-            license_parts = cells[3].get_text(strip=True).split(" ", 1)
-            license_category = license_parts[0]  # Halle/Beach
-            license_type = license_parts[1]  # level
-
-            # Get the text from each cell and store it in a dictionary
-            entry = {
-                'last_name': cells[1].get_text(strip=True),
-                'first_name': cells[2].get_text(strip=True),
-                'license_category': license_category,
-                'license_type': license_type,
-                'license_id': cells[4].get_text(strip=True),
-                'license_bvv_id': internal_license_id,
-                'license_since': cells[5].get_text(strip=True),
-                'license_expire': cells[6].get_text(strip=True),
-                'club': cells[7].get_text(strip=True)
-            }
-
-            # Add the entry to the entries list
-            entries.append(entry)
-
-        # Create a DataFrame from the entries list
-        df = pd.DataFrame(entries)
+            license_parts = cells[3].text_content().strip().split(" ", 1)
+
+            columns['last_name'].append(cells[1].text_content().strip())
+            columns['first_name'].append(cells[2].text_content().strip())
+            columns['license_category'].append(license_parts[0])  # Halle/Beach
+            columns['license_type'].append(license_parts[1])  # level
+            columns['license_id'].append(cells[4].text_content().strip())
+            columns['license_bvv_id'].append(internal_license_id)
+            columns['license_since'].append(cells[5].text_content().strip())
+            columns['license_expire'].append(cells[6].text_content().strip())
+            columns['club'].append(cells[7].text_content().strip())
+
+        # Create a DataFrame from the column lists
+        df = pd.DataFrame(columns)
         return df
 
     def _scalp_licenses(self, session):
@@ -334,8 +417,7 @@ class BVVScalper:
             logging.error("BVV_SCALPER: response failed for load_licenses")
             return None
 
-        response.encoding = BVVScalper._ENCODING
-        return response.text
+        return response.content
 
     def _download_licenses(self):
         df = self._scalped_licenses_excel
@@ -376,8 +458,7 @@ class BVVScalper:
             logging.error("BVV_SCALPER: response failed for download_licenses")
             return None
 
-        with io.BytesIO(response.content) as fh:
-            return pd.io.excel.read_excel(fh, sheet_name=0)
+        return pd.read_excel(io.BytesIO(response.content), sheet_name=0, engine="openpyxl")
 
     # =================================================================================================================
     #      COURSES
@@ -396,62 +477,59 @@ class BVVScalper:
         # transform additional date columns
         date_columns = ["deregistration_end", "reregistration_end"]
         for column in date_columns:
-            courses[column] = pd.to_datetime(courses[column], format=self.bvv_date_format)
+            courses[column] = pd.to_datetime(courses[column], format=self.bvv_date_format, cache=True)
 
         logging.debug(f"BVV_SCALPER: get_deep_courses_info successfully for lids = {lids}")
 
         return courses
 
     def _fetch_courses(self):
-        content = self._scalped_courses_content
-        soup = BeautifulSoup(content, 'html.parser')
-
         # Find the course table by its class name
-        table = soup.find('table', {'class': 'portaltable'})
+        table = self._courses_tree.find('.//table[@class="portaltable"]')
 
-        data_list = []
+        # collect one list per column so the DataFrame is built without a per-row dict pass
+        columns = {name: [] for name in ('id', 'district', 'label', 'type', 'date_start', 'date_end',
+                                         'license_category', 'license_type', 'city', 'registration_start',
+                                         'registration_end', 'free_space', 'granted_space', 'waiting_count')}
 
         # Loop through each row in the table
-        current_section = None
-        for row in table.find_all('tr'):
+        current_types = None
+        for row in table.findall('.//tr'):
             # Check if row is a section header
-            section = row.find('div', {'class': 'sectionheader'})
-            if section:
-                current_section = section.text
+            section = row.find('.//div[@class="sectionheader"]')
+            if section is not None:
+                # classify the section once instead of re-parsing it for every course row
+                current_types = self.get_types_from_course_section(section.text_content())
                 continue
 
             # Extract data from each cell in the row
-            cells = row.find_all('td')
+            cells = row.findall('td')
             if len(cells) > 1:  # Ignore rows that don't have multiple cells (like headers)
-                course_type, license_category, license_type = self.get_types_from_course_section(current_section)
-                date_start, date_end = self.get_date_bounds(cells[1].text)
-                register_start, register_end = self.get_date_bounds(cells[4].text)
+                course_type, license_category, license_type = current_types
+                date_start, date_end = self.get_date_bounds(cells[1].text_content())
+                register_start, register_end = self.get_date_bounds(cells[4].text_content())
 
                 # Extract the 'lid' from the last cell's 'href' attribute
-                lid_link = cells[8].find('a')['href']
+                lid_link = cells[8].find('.//a').get('href')
                 lid = lid_link.split('lid=')[1].split('&')[0]
 
-                data_dict = {
-                    'id': lid,
-                    'district': cells[0].text,
-                    'label': cells[2].text,
-                    'type': course_type,
-                    'date_start': date_start,
-                    'date_end': date_end,
-                    'license_category': license_category,
-                    'license_type': license_type,
-                    'city': cells[3].text,
-                    'registration_start': register_start,
-                    'registration_end': register_end,
-                    'free_space': cells[5].text,
-                    'granted_space': self.get_granted_space(cells[6].text),
-                    'waiting_count': cells[7].text
-                }
-
-                data_list.append(data_dict)
-
-        # Convert the list of dictionaries to a pandas DataFrame
-        df = pd.DataFrame(data_list)
+                columns['id'].append(lid)
+                columns['district'].append(cells[0].text_content())
+                columns['label'].append(cells[2].text_content())
+                columns['type'].append(course_type)
+                columns['date_start'].append(date_start)
+                columns['date_end'].append(date_end)
+                columns['license_category'].append(license_category)
+                columns['license_type'].append(license_type)
+                columns['city'].append(cells[3].text_content())
+                columns['registration_start'].append(register_start)
+                columns['registration_end'].append(register_end)
+                columns['free_space'].append(cells[5].text_content())
+                columns['granted_space'].append(cells[6].text_content())
+                columns['waiting_count'].append(cells[7].text_content())
+
+        # Convert the column lists to a pandas DataFrame
+        df = pd.DataFrame(columns)
 
         logging.info("BVV_SCALPER: fetched courses")
         return df
@@ -472,8 +550,7 @@ class BVVScalper:
         if response.status_code != 200:  # status_code 200 == success
             return []
 
-        response.encoding = BVVScalper._ENCODING
-        return response.text
+        return response.content
 
     def _fetch_deep_course_info(self, lids: Union[list[str], str]):
         """
@@ -485,14 +562,15 @@ class BVVScalper:
             lids = [lids]
         self._request_timing()
 
-        contents = []
-        with self._login() as session:
-            for lid in lids:
-                url = self.url_course_deep_get + f"&lid={lid}"
-                response = session.get(url)
-                response.encoding = self._ENCODING
-                contents.append(response.text)
-            self._logout(session)
+        session = self._login()
+
+        def fetch_one(lid):
+            return session.get(self.url_course_deep_get + f"&lid={lid}").content
+
+        # independent I/O-bound GETs, the pooled session handles them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            contents = list(executor.map(fetch_one, lids))
+        self._logout(session)
 
         res = []
         for i in range(len(lids)):
@@ -506,52 +584,40 @@ class BVVScalper:
 
     def _transform_course_df(self, courses):
         # drop anything other than Ausbildung/Fortbildung
-        courses = courses.loc[courses["type"].isin(["Ausbildung", "Fortbildung"])].copy()
+        courses = courses.loc[courses["type"].isin(["Ausbildung", "Fortbildung"])]
 
-        # transform date columns
+        # transform dates, numbers and the type labels in one assign instead of chained .loc writes
         date_columns = ["date_start", "date_end", "registration_start", "registration_end"]
-        for column in date_columns:
-            courses.loc[:, column] = pd.to_datetime(courses[column], format=self.bvv_date_format)
-
-        # transform numeric columns
-        numeric_columns = ["free_space", "granted_space", "waiting_count"]
-        for column in numeric_columns:
-            courses.loc[:, column] = pd.to_numeric(courses[column], errors="coerce")
-
-        # rename certain values
-        courses.loc[courses["type"] == "Ausbildung", "type"] = "training"
-        courses.loc[courses["type"] == "Fortbildung", "type"] = "refresher"
+        numeric_columns = ["free_space", "waiting_count"]
+        courses = courses.assign(
+            **{column: pd.to_datetime(courses[column], format=self.bvv_date_format, cache=True)
+               for column in date_columns},
+            **{column: pd.to_numeric(courses[column], errors="coerce") for column in numeric_columns},
+            # non-numeric granted_space placeholders mean no granted space at all
+            granted_space=pd.to_numeric(courses["granted_space"], errors="coerce").fillna(0),
+            type=courses["type"].map({"Ausbildung": "training", "Fortbildung": "refresher"})
+        )
 
         return courses
 
     @staticmethod
     def get_deep_course_info_from_content(lid: str, content):
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = BeautifulSoup(content, 'lxml', from_encoding=BVVScalper._ENCODING,
+                             parse_only=SoupStrainer('table'))
         fetched_info = {}
 
-        course_table = soup.find_all('table')[0]  # Assuming the first table contains additional information for course
-        for row in course_table.find_all('tr'):
-            cells = row.find_all('td')
-            if len(cells) == 2:
-                key = cells[0].text.strip().replace(":", "")
-                value = cells[1].text.strip()
-                fetched_info[key] = value
-
-        contact_table = soup.find_all('table')[1]  # Assuming the second table contains contact information
-        for row in contact_table.find_all('tr'):
-            cells = row.find_all('td')
-            if len(cells) == 2:
-                key = cells[0].text.strip().replace(":", "")
-                value = cells[1].text.strip()
-                fetched_info["contact_" + key] = value
-
-        space_table = soup.find_all('table')[2]
-        for row in space_table.find_all('tr'):
-            cells = row.find_all('td')
-            if len(cells) == 2:
-                key = cells[0].text.strip().replace(":", "")
-                value = cells[1].text.strip()
-                fetched_info["space_" + key] = value
+        def read_key_value_rows(table, prefix=""):
+            # read each cell's text exactly once per row
+            for row in table.find_all('tr'):
+                cells = row.find_all('td')
+                if len(cells) == 2:
+                    key = cells[0].get_text(strip=True).replace(":", "")
+                    fetched_info[prefix + key] = cells[1].get_text(strip=True)
+
+        tables = soup.find_all('table', limit=3)
+        read_key_value_rows(tables[0])  # Assuming the first table contains additional information for course
+        read_key_value_rows(tables[1], prefix="contact_")  # Assuming the second table contains contact information
+        read_key_value_rows(tables[2], prefix="space_")
 
         course_type, license_category, license_type = BVVScalper.get_types_from_course_section(fetched_info['Typ'])
         register_start, register_end = BVVScalper.get_date_bounds(fetched_info['Anmeldezeitraum'])
@@ -570,7 +636,7 @@ class BVVScalper:
             'registration_start': register_start,
             'registration_end': register_end,
             'free_space': fetched_info['space_freie Plätze'],
-            'granted_space': BVVScalper.get_granted_space(fetched_info['space_davon sofort verfügbar']),
+            'granted_space': fetched_info['space_davon sofort verfügbar'],
             'waiting_count': fetched_info['space_auf Warteliste'],
             'deregistration_end': fetched_info['Abmeldeschluss'],
             'reregistration_end': fetched_info['Ummeldeschluss'],
@@ -594,38 +660,25 @@ class BVVScalper:
         :param section_name: the fetched section_name
         :return: course_type (Ausbildung/Fortbildung), license_category (Halle/Beach/Trainer), license_type (B, BK, C, CP, CT, D)
         """
-        split = section_name.split("-")
-
-        if len(split) > 1:
-            # license_category (Halle, Beach)
-            if section_name.startswith("Beach"):
-                license_category = "Beach"
-            elif "Trainer" in section_name:
-                logging.debug(f"BVV_SCALPER: section name {section_name} led to hard coded trainer course.")
-                return "Regelkunde", "Trainer", "C"  # stupid exception "Regelkunde C-Trainer / Regeltest
-            else:
-                license_category = "Halle"
-
-            # license_type (B, BK, C, CT, CP, D, Jugend)
-            license_type = split[0].removeprefix("Beach ")  # remove Beach prefix if present
-            if section_name.endswith("(Theorie)"):
-                license_type += "T"
-            elif section_name.endswith("(Praxis)"):
-                license_type += "P"
-            elif section_name.endswith("(Theorie und Praxis") or section_name.endswith("(Theorie + Praxis)"):
-                license_type += ""
-
-            # course_type (Ausbildung/Fortbildung)
-            if "Ausbildung" in section_name:
-                course_type = "Ausbildung"
-            elif "Fortbildung" in section_name:
-                course_type = "Fortbildung"
-            else:
-                course_type = "UNDEFINED"
+        match = BVVScalper._SECTION_RE.match(section_name)
+        if match is None:
+            return None
+
+        if not section_name.startswith("Beach") and "Trainer" in section_name:
+            logging.debug(f"BVV_SCALPER: section name {section_name} led to hard coded trainer course.")
+            return "Regelkunde", "Trainer", "C"  # stupid exception "Regelkunde C-Trainer / Regeltest
+
+        # license_category (Halle, Beach)
+        license_category = "Beach" if section_name.startswith("Beach") else "Halle"
 
-            logging.debug(f"BVV_SCALPER: section name {section_name} led to: course_type = {course_type}, license_category = {license_category}, license_type = {license_type}.")
-            return course_type, license_category, license_type
-        return None
+        # license_type (B, BK, C, CT, CP, D, Jugend), mode parenthesis appends T/P
+        license_type = match["license_type"] + BVVScalper._SECTION_MODE_SUFFIX.get(match["mode"], "")
+
+        # course_type (Ausbildung/Fortbildung)
+        course_type = match["course_type"] or "UNDEFINED"
+
+        logging.debug(f"BVV_SCALPER: section name {section_name} led to: course_type = {course_type}, license_category = {license_category}, license_type = {license_type}.")
+        return course_type, license_category, license_type
 
     @staticmethod
     def get_date_bounds(period: str):
@@ -634,12 +687,12 @@ class BVVScalper:
         :param period: the period string
         :return: start, end as strings
         """
-        period_split = period.split(' - ')
-        if len(period_split) == 1:
+        match = BVVScalper._PERIOD_RE.match(period)
+        if match is None:
             return period.strip(), period.strip()
         else:
-            date_str1 = period_split[0]
-            date_str2 = period_split[1]
+            date_str1 = match["start"]
+            date_str2 = match["end"]
 
             # Split each date string into components
             components1 = date_str1.split('.')
@@ -671,9 +724,9 @@ class BVVScalper:
             return personal_data
 
         # transform data
-        personal_data["sex"] = personal_data["sex"].apply(self.get_sex)
-        personal_data["phone"] = personal_data.apply(lambda row: self.get_phone(row["phone_g"], row["phone_p"]), axis=1)
-        personal_data["birthday"] = pd.to_datetime(personal_data["birthday"], format=self.bvv_date_format)
+        personal_data["sex"] = self.get_sex_series(personal_data["sex"])
+        personal_data["phone"] = self.get_phone_series(personal_data["phone_g"], personal_data["phone_p"])
+        personal_data["birthday"] = pd.to_datetime(personal_data["birthday"], format=self.bvv_date_format, cache=True)
 
         # replace empty strings with nan
         personal_data = personal_data.replace("", np.nan)
@@ -681,43 +734,47 @@ class BVVScalper:
         return personal_data
 
     def _fetch_personal_data_by_bvv_ids(self, bvv_user_ids: list[str]):
-        contents = []
-
         self._request_timing()
-        with self._login() as session:
-            for bvv_user_id in bvv_user_ids:
-                # get personal info with bvv_user_id
-                get_url = self.url_person_search_get + "&userid=" + str(bvv_user_id)
-                response = session.get(get_url)
-                if response.status_code != 200:
-                    logging.error(f"BVV_SCALPER: response failed for get_personal_info (bvv_user_id = {bvv_user_id})")
-                    continue
-
-                response.encoding = self._ENCODING
-                contents.append(response.text)
-            self._logout(session)
+        session = self._login()
+
+        def fetch_one(bvv_user_id):
+            # get personal info with bvv_user_id
+            get_url = self.url_person_search_get + "&userid=" + str(bvv_user_id)
+            response = session.get(get_url)
+            if response.status_code != 200:
+                logging.error(f"BVV_SCALPER: response failed for get_personal_info (bvv_user_id = {bvv_user_id})")
+                return None
+            return response.content
+
+        # independent I/O-bound GETs, the pooled session handles them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            contents = list(executor.map(fetch_one, bvv_user_ids))
+        self._logout(session)
 
         res_data = []
-        for content in contents:
-            soup = BeautifulSoup(content, 'html.parser')
+        for bvv_user_id, content in zip(bvv_user_ids, contents):
+            if content is None:
+                continue
+            tree = self._parse_html(content)
+
+            # index all labels in one pass, every field lookup is then a dict access
+            labels = {label.get('id'): label for label in tree.iter('label')}
+            sex_label = labels['user_geschlecht_getGeschlechtBezeichnung__GeschlechtFormatterA__']
 
             data = {
                 "bvv_user_id": bvv_user_id,
-                "last_name": soup.find('label', {'id': 'user_name'}).get_text(),
-                "first_name": soup.find('label', {'id': 'user_vorname'}).get_text(),
-                "sex": soup.find('label', {
-                    'id': 'user_geschlecht_getGeschlechtBezeichnung__GeschlechtFormatterA__'}).get_text(),
-                "birthday": soup.find('label', {
-                    'id': 'user_geschlecht_getGeschlechtBezeichnung__GeschlechtFormatterA__'}).find_next('td').find_next(
-                    'td').get_text(),
-                "mail": soup.find('label', {'id': 'user_email'}).get_text(),
-                "street": soup.find('label', {'id': 'user_strasse'}).get_text(),
-                "postalcode": soup.find('label', {'id': 'user_plz'}).get_text(),
-                "city": soup.find('label', {'id': 'user_ort'}).get_text(),
-                "country": soup.find('label', {'id': 'user_land'}).get_text(),
-                "phone_p": soup.find('label', {'id': 'user_telefon_p'}).get_text(),
-                "phone_g": soup.find('label', {'id': 'user_telefon_g'}).get_text(),
-                "mobile": soup.find('label', {'id': 'user_mobil'}).get_text()
+                "last_name": labels['user_name'].text_content(),
+                "first_name": labels['user_vorname'].text_content(),
+                "sex": sex_label.text_content(),
+                "birthday": self._BIRTHDAY_XPATH(sex_label)[0].text_content(),
+                "mail": labels['user_email'].text_content(),
+                "street": labels['user_strasse'].text_content(),
+                "postalcode": labels['user_plz'].text_content(),
+                "city": labels['user_ort'].text_content(),
+                "country": labels['user_land'].text_content(),
+                "phone_p": labels['user_telefon_p'].text_content(),
+                "phone_g": labels['user_telefon_g'].text_content(),
+                "mobile": labels['user_mobil'].text_content()
             }
             res_data.append(data)
             logging.info("BVV_SCALPER: fetched personal info for " + data["last_name"] + ", " + data["first_name"])
@@ -728,49 +785,67 @@ class BVVScalper:
         if names.isna().any().any():
             raise ValueError("last_name and/or first_name has nan values!")
 
-        id_contents = []
         bvv_user_ids = []
 
         self._request_timing()
-        with self._login() as session:
-            for _, row in names.iterrows():
-
-                form_action_url = self.url_person_search_action
-                form_data = {
-                    "vereinsid": self.club_id,
-                    "operation": "suche",
-                    "name": row["last_name"],
-                    "vorname": row["first_name"]
-                }
-                response = session.post(form_action_url, data=form_data)
-                if response.status_code != 200:
-                    logging.error(f"BVV_SCALPER: response failed for fetching user_id with {form_data['name']}, {form_data['vorname']}")
-                    continue
-
-                response.encoding = self._ENCODING
-                id_contents.append(response.text)
-            self._logout(session)
-
-        for id_content in id_contents:
-            soup = BeautifulSoup(id_content, 'html.parser')
-            try:
-                # Find the 'sectionheader' div and then find the subsequent 'portaltable' table
-                table = soup.find('div', class_='sectionheader').find_next('table', class_='portaltable')
+        session = self._login()
+
+        def fetch_one(name_pair):
+            last_name, first_name = name_pair
+            form_data = {
+                "vereinsid": self.club_id,
+                "operation": "suche",
+                "name": last_name,
+                "vorname": first_name
+            }
+            response = session.post(self.url_person_search_action, data=form_data)
+            if response.status_code != 200:
+                logging.error(f"BVV_SCALPER: response failed for fetching user_id with {last_name}, {first_name}")
+                return None
+            return response.content
+
+        name_pairs = list(names.itertuples(index=False, name=None))
 
-                # Find the 'a' tag within the table and extract the 'href' attribute
-                href = table.find('a')['href']
+        # independent I/O-bound searches, the pooled session handles them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            id_contents = list(executor.map(fetch_one, name_pairs))
+        self._logout(session)
 
-                # Extract the userid from the 'href' attribute using string splitting methods
-                bvv_user_id = href.split('userid=')[1].split('&')[0]
+        for (last_name, first_name), id_content in zip(name_pairs, id_contents):
+            if id_content is None:
+                continue
+            tree = self._parse_html(id_content)
+            try:
+                # Find the first link of the 'portaltable' following the 'sectionheader' div
+                href = self._USER_LINK_XPATH(tree)[0]
+
+                # Extract the userid from the 'href' attribute (no match raises into the except below)
+                bvv_user_id = self._USERID_RE.search(href).group(1)
                 bvv_user_ids.append(bvv_user_id)
             except Exception as err:
                 logging.error(
                     f"BVV_SCALPER: An error occurred while fetching bvv_user_id get_personal_info: {err=}, {type(err)=}. "
-                    f"Most likely {form_data['name']}, {form_data['vorname']} does not exist on the BVV page.")
+                    f"Most likely {last_name}, {first_name} does not exist on the BVV page.")
                 continue
 
         return bvv_user_ids
 
+    @staticmethod
+    def get_sex_series(bvv_sex: pd.Series):
+        """
+        Vectorized get_sex: unknown values map to nan.
+        """
+        return bvv_sex.map({"männlich": "m", "weiblich": "f"})
+
+    @staticmethod
+    def get_phone_series(phone_g: pd.Series, phone_p: pd.Series):
+        """
+        Vectorized get_phone: prefer the private number, fall back to the business one,
+        empty strings count as missing.
+        """
+        phone = phone_p.where(phone_p.notna() & (phone_p != ""), phone_g)
+        return phone.where(phone.notna() & (phone != ""))
+
     @staticmethod
     def get_sex(bvv_sex):
         if bvv_sex == "männlich":
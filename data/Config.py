@@ -17,11 +17,17 @@ import json
 import logging
 from typing import Union
 
+try:  # optional, parses noticeably faster than the stdlib
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Config:
 
     def __init__(self, json_obj: dict):
         self.json = json_obj
+        self._cache = {}  # resolved key paths, cleared on every set
 
     @staticmethod
     def load(file):
@@ -30,7 +36,10 @@ class Config:
         :param file: the file.
         :return: the config.
         """
-        json_obj = json.load(file)
+        if orjson is not None:
+            json_obj = orjson.loads(file.read())
+        else:
+            json_obj = json.load(file)
         logging.debug(f"loaded config from file {file}.")
         return Config(json_obj=json_obj)
 
@@ -62,14 +71,21 @@ class Config:
         else:
             old_value = json_navigated[key[-1]]
             json_navigated[key[-1]] = value
+        self._cache.clear()
         logging.debug(f"changed config value {key} from {old_value} to {value}")
 
     def get(self, key: Union[list[str], str]):
+        cache_key = key if isinstance(key, str) else tuple(key)
+        if cache_key in self._cache:
+            return self._cache[cache_key]
+
         json_navigated = self.__navigate_json(key)
         if isinstance(key, str):
-            return json_navigated
+            value = json_navigated
         else:
-            return json_navigated[key[-1]]
+            value = json_navigated[key[-1]]
+        self._cache[cache_key] = value
+        return value
 
 
 def dump(config: Config, file, indent=4):
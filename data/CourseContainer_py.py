@@ -15,7 +15,8 @@
 
 import logging
 import os
-from typing import Union
+from functools import cache
+from typing import Iterable, Union
 
 import pandas as pd
 
@@ -28,16 +29,19 @@ from datetime import datetime
 class CourseContainer(DataContainer):
 
     @classmethod
+    @cache
     def get_subfolder_name(cls):
         return "courses"
 
     @classmethod
+    @cache
     def get_data_csv_name(cls):
         return "courses_data"
 
     @classmethod
+    @cache
     def get_data_types(cls):
-        # deep data must be counted below!
+        # deep data must be listed in _DEEP_COLUMNS below!
         return {
             "id": str,
             "district": str,
@@ -71,7 +75,9 @@ class CourseContainer(DataContainer):
             "player_reminder_count": 0
         }
 
-    _DEEP_DATA_COUNT = 8
+    # the columns only available on a course's detail page
+    _DEEP_COLUMNS = ("reregistration_end", "deregistration_end", "address", "remark",
+                     "contact_name", "contact_mail", "contact_phone", "contact_mobile")
     _SUBFOLDER_BACKUP_NAME = "backup"
 
     def get_backup_dir(self):
@@ -81,14 +87,57 @@ class CourseContainer(DataContainer):
         return directory
 
     def __init__(self, config: Config, scalper: BVVScalper):
+        self._indexed_cache = None
+        self._decorated_cache = None
         super().__init__(config, scalper)
         return
 
+    @property
+    def indexed(self):
+        """
+        self.data indexed by course id with the id column kept, for O(1) course lookups.
+        Memoized until the underlying data changes.
+        :return: the id-indexed courses df (shared instance, do not mutate).
+        """
+        if self._indexed_cache is None:
+            self._indexed_cache = self.data.set_index("id", drop=False)
+        return self._indexed_cache
+
+    def get_decorated(self):
+        """
+        Course table prepared for joining into registration frames: indexed by course_id,
+        label dropped and every column carrying a course_ prefix. Memoized until the
+        underlying data changes.
+        :return: the prefixed course df (shared instance, do not mutate).
+        """
+        if self._decorated_cache is None:
+            self._decorated_cache = self.data.drop(columns=["label"]).add_prefix("course_", axis=1).set_index("course_id")
+        return self._decorated_cache
+
+    def _invalidate_caches(self):
+        super()._invalidate_caches()
+        self._indexed_cache = None
+        self._decorated_cache = None
+
+    def increment_reminder_counts(self, ids, column):
+        """
+        Increments the given reminder-count column by 1 for all given course ids.
+        :param ids: iterable of course ids.
+        :param column: "management_reminder_count" or "player_reminder_count"
+        :return: Nothing.
+        """
+        ids = list(ids)
+        if len(ids) == 0:
+            return
+        self.data.loc[self.data["id"].isin(ids), column] += 1
+        self._invalidate_caches()
+        return
+
     def save(self):
         self.data = self.data.sort_values(by=["district", "type", "license_category", "license_type", "registration_end"], ascending=[True, True, True, True, True])
         return super().save()
 
-    def assert_deep_data(self, lids: Union[list[str], str]):
+    def assert_deep_data(self, lids: Union[Iterable[str], str]):
         if isinstance(lids, str):
             lids = [lids]
 
@@ -99,7 +148,7 @@ class CourseContainer(DataContainer):
         selected_courses = self.data[self.data["id"].isin(lids)]
 
         # select any row with no deep data at all (to prevent constant updating when not every deep data is filled by BVV)
-        selected_courses_na = selected_courses[selected_courses.isna().sum(axis=1) >= self._DEEP_DATA_COUNT]
+        selected_courses_na = selected_courses[selected_courses[list(self._DEEP_COLUMNS)].isna().all(axis=1)]
 
         if len(selected_courses_na) > 0:
             lids = selected_courses_na["id"].tolist()
@@ -134,36 +183,27 @@ class CourseContainer(DataContainer):
         # Ensure only columns present in data_df are updated
         columns_to_update = [col for col in columns if col in self.data.columns]
 
-        # Merge with indicator to see which rows are present in both DataFrames (_merge column with left_only, right_only, both)
-        merged_df = pd.merge(self.data, df[keys + columns_to_update],
-                             on=keys, how='outer', suffixes=('', '_update'), indicator=True)
-
-        # Update the specified columns if the value in df is not null, for existing columns only
-        for column in columns_to_update:
-            condition = ~merged_df[column + '_update'].isna()
-            merged_df.loc[condition, column] = merged_df.loc[condition, column + '_update']
-
-        # Drop the temporary update columns and the _merge indicator, sort the table for readability
-        merged_df.drop(columns=[col + '_update' for col in columns], inplace=True)
+        # Index both frames on id: the overlap becomes one aligned update, additions one concat
+        data_indexed = self.data.set_index("id")
+        update_indexed = df.set_index("id")[columns_to_update]
 
-        # Insert default values for newly added rows, provided data will not get overwritten
-        mask = merged_df['_merge'] == 'right_only'
-        subset = merged_df[mask]
-        data_defaults = self._get_data_defaults()
-        filled_subset = subset.fillna(data_defaults)
-        merged_df.loc[mask] = filled_subset
+        # Update the specified columns if the value in df is not null (DataFrame.update skips NaNs)
+        data_indexed.update(update_indexed)
 
-        result = merged_df[(merged_df['_merge'] == 'right_only')].copy()
+        # Ids only present in the update df are new courses, insert default values for them
+        new_courses = update_indexed.loc[~update_indexed.index.isin(data_indexed.index)]
+        new_courses = new_courses.reindex(columns=data_indexed.columns).fillna(self._get_data_defaults())
 
-        merged_df.drop(columns=["_merge"], inplace=True)
+        # Sort the table for readability
+        merged_df = pd.concat([data_indexed, new_courses]).reset_index()
         merged_df.sort_values(by=["district", "type", "license_category", "license_type", "registration_end"],
                               ascending=[True, True, True, True, False], inplace=True)
 
         self.data = merged_df
 
         # Prepare result
-        result.drop(columns=["_merge"], inplace=True)
+        result = new_courses.reset_index()
         result.sort_values(by=["registration_start"], ascending=False, inplace=True)
-        new_ids = [i for i in result["id"]].sort()
+        new_ids = result["id"].sort_values().tolist()
         logging.info(f"updating courses_df resulted in new courses. Added ids: {new_ids}")
         return result
@@ -16,6 +16,7 @@
 import logging
 import os
 from datetime import date, datetime
+from functools import cache
 
 import numpy as np
 import pandas as pd
@@ -35,6 +36,7 @@ class DataContainer:
         raise NotImplementedError("data_types must be specified.")
 
     @classmethod
+    @cache
     def get_subfolder_name(cls):
         return ""
 
@@ -43,10 +45,28 @@ class DataContainer:
     def __init__(self, config: Config, scalper: BVVScalper):
         self.scalper = scalper
         self.config = config
-        self.data = None
+        self.data_version = 0
+        self._data = None
         self.__dir_path = None
         return
 
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._invalidate_caches()
+
+    def _invalidate_caches(self):
+        """
+        Bumps data_version and drops any derived views of self.data. Rebinding self.data
+        calls this automatically; methods that mutate the frame in place must call it
+        themselves. Subclasses with caches override this and call super().
+        """
+        self.data_version += 1
+
     def get_dir(self):
         if self.__dir_path is None:
             self.__dir_path = self.config.get(self._config_main_folder_path)
@@ -80,16 +100,20 @@ class DataContainer:
         pattern = data_csv_name + "_"
         logging.info(f"starting to load {data_csv_name}...")
 
-        # List all files in the directory that match the naming pattern
-        files = [f for f in os.listdir(directory) if f.startswith(pattern) and f.endswith(".csv")]
+        # List all files in the directory that match the naming pattern;
+        # scandir caches the stat results, so sorting by mtime costs no extra syscalls
+        with os.scandir(directory) as entries:
+            matching = [entry for entry in entries
+                        if entry.name.startswith(pattern) and entry.name.endswith(".csv")]
 
-        if len(files) == 0:
+        if len(matching) == 0:
             logging.warning(f"could not find any files in {directory} matching pattern {pattern}.")
             self.data = pd.DataFrame(columns=data_types.keys())
             return
 
         # Sort the files by modification time, from oldest to newest
-        files.sort(key=lambda x: os.path.getmtime(os.path.join(directory, x)))
+        matching.sort(key=lambda entry: entry.stat().st_mtime)
+        files = [entry.name for entry in matching]
 
         # Identify the file(s) to keep
         files_to_keep = files[-keep_n:]
@@ -105,13 +129,17 @@ class DataContainer:
 
         date_columns = [column for column, dtype in data_types.items() if dtype == datetime]
 
-        df = pd.read_csv(latest_file_path)  # may be modified by user!
+        # peek at the header first so parse_dates only names columns that are
+        # actually present (the file may be modified by the user!)
+        header_columns = pd.read_csv(latest_file_path, nrows=0).columns
+        parse_columns = [column for column in date_columns if column in header_columns]
+        try:
+            df = pd.read_csv(latest_file_path, parse_dates=parse_columns, engine="pyarrow")
+        except (ImportError, ValueError):
+            # pyarrow is not installed or rejected the file, use the default engine
+            df = pd.read_csv(latest_file_path, parse_dates=parse_columns)
         logging.info(f"loaded data from file {files_to_keep[-1]}")
 
-        # parse dates manually because of date type
-        for date_column in date_columns:
-            df[date_column] = pd.to_datetime(df[date_column])
-
         # add all columns that are non-existent as nan columns
         df = df.reindex(columns=self.get_data_types().keys())
         # fill in default values
@@ -129,24 +157,25 @@ class DataContainer:
         directory = self.get_dir()
         timestamp = date.today()
 
-        data_to_save = self.data.copy()
-
         expected_data_types = self.get_data_types()
 
-        # only sort present columns, delete columns we do not want to save
-        filtered_dict = {key: value for key, value in expected_data_types.items() if key in data_to_save.columns}
-        data_to_save = data_to_save[list(filtered_dict.keys())]
+        # only sort present columns, delete columns we do not want to save;
+        # copy just that selection instead of the whole frame
+        filtered_dict = {key: value for key, value in expected_data_types.items() if key in self.data.columns}
+        data_to_save = self.data.loc[:, list(filtered_dict.keys())].copy()
 
         # Do desired/necessary conversions
         for column in data_to_save.columns:
-            # Convert datetime columns to date
-
+            # Convert datetime columns to date, skipping the parse when the dtype already fits
             if expected_data_types[column] is datetime:
-                data_to_save[column] = pd.to_datetime(data_to_save[column]).dt.date
+                converted = data_to_save[column]
+                if not pd.api.types.is_datetime64_any_dtype(converted):
+                    converted = pd.to_datetime(converted)
+                data_to_save[column] = converted.dt.date
 
             # change possible linebreaks \n to \\n to preserve them!
             if filtered_dict[column] == str:
-                data_to_save.loc[:, column] = data_to_save[column].apply(lambda x: x.replace('\n', '\\n') if isinstance(x, str) else x)
+                data_to_save[column] = data_to_save[column].astype("string").str.replace('\n', '\\n', regex=False)
 
         # save data with timestamp
         save_name = self.get_data_csv_name() + f"_{timestamp}.csv"
@@ -185,16 +214,18 @@ class DataContainer:
         # Separate handling for specific dtypes
         for column, dtype in filtered_dict.items():
             if dtype == datetime:
-                df[column] = pd.to_datetime(df[column], format="ISO8601")
+                # keep columns in their native datetime64[ns] representation so downstream
+                # comparisons stay vectorized; only parse when something else slipped in
+                if not pd.api.types.is_datetime64_any_dtype(df[column]):
+                    df[column] = pd.to_datetime(df[column], format="ISO8601")
             elif dtype == int or dtype == float:
                 df[column] = pd.to_numeric(df[column], errors="coerce")
             elif dtype == bool:
-                df[column] = df[column].apply(lambda x: True if x in [True, "True", "true"] else False).astype(bool)
+                df[column] = df[column].astype("string").isin(["True", "true"]).astype(bool)
             else:
                 df[column] = df[column].astype(dtype)
 
         # prevent strings "nan"
         with pd.option_context('future.no_silent_downcasting', True):
-            df = df.replace("nan", np.nan)
-            df = df.replace("", np.nan)
+            df = df.replace({"nan": np.nan, "": np.nan})
         return df
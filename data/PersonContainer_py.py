@@ -16,19 +16,24 @@
 import logging
 import os
 from datetime import datetime, date
+from functools import cache
 from typing import Union
 
+import numpy as np
 import pandas as pd
 
 from data.BVVScalper_py import BVVScalper
 from data.Config import Config
 from data.DataContainer_py import DataContainer
-from data.helpfunctions import remove_duplicates
+from data.helpfunctions import remove_duplicates, save_csv
+
+logger = logging.getLogger(__name__)
 
 
 class PersonContainer(DataContainer):
 
     @classmethod
+    @cache
     def get_data_types(cls):
         return {
             "last_name": str,
@@ -58,10 +63,12 @@ class PersonContainer(DataContainer):
         }
 
     @classmethod
+    @cache
     def get_subfolder_name(cls):
         return "persons"
 
     @classmethod
+    @cache
     def get_data_csv_name(cls):
         return "persons_data"
 
@@ -70,7 +77,7 @@ class PersonContainer(DataContainer):
         # df = replace_umlaute(df, columns=["last_name", "first_name", "club"])
         df = remove_duplicates(df, save_path_duplicates=os.path.join(self.get_backup_dir(),
                                                                      "duplicate_persons_loading.csv"))
-        logging.debug("finished validating of data.")
+        logger.debug("finished validating of data.")
         return df
 
     _SUBFOLDER_BACKUP_NAME = "backup"
@@ -85,17 +92,54 @@ class PersonContainer(DataContainer):
         return directory
 
     def __init__(self, config: Config, scalper: BVVScalper):
+        self._license_index = None
+        self._decorated_cache = None
         super().__init__(config, scalper)
         self.clubname = config.get(self._json_club_name)
         return
 
+    def _get_license_index(self):
+        """
+        Lazily built lookup of (license_category, license_type) -> row positions in self.data.
+        Must be invalidated whenever self.data is replaced or licenses change.
+        """
+        if self._license_index is None:
+            self._license_index = self.data.groupby(["license_category", "license_type"], observed=True).indices
+        return self._license_index
+
+    def _invalidate_caches(self):
+        super()._invalidate_caches()
+        self._license_index = None
+        self._decorated_cache = None
+
+    def get_decorated(self):
+        """
+        Person table prepared for joining into registration frames: indexed by the name keys,
+        all data columns carry a person_ prefix and person_club_member_status marks currently
+        valid club memberships. Memoized until the underlying data changes.
+        :return: the decorated persons df (shared instance, do not mutate).
+        """
+        if self._decorated_cache is None:
+            df = self.data.copy()
+            # skip the expensive per-element parse when the column is already datetime64
+            if not pd.api.types.is_datetime64_any_dtype(df["club_membership_expire"]):
+                df["club_membership_expire"] = pd.to_datetime(df["club_membership_expire"], format="ISO8601")
+            df["club_member_status"] = (df["club_membership_expire"] >= datetime.now()) | df[
+                "club_membership_expire"].isna()
+            df = df.add_prefix("person_", axis=1)
+            df = df.rename(columns={"person_last_name": "last_name", "person_first_name": "first_name",
+                                    "person_birthday": "birthday"})
+            self._decorated_cache = df.set_index(["last_name", "first_name", "birthday"])
+        return self._decorated_cache
+
     def _get_data_defaults(self):
+        # one instant for both license dates, they should never drift apart
+        today = datetime.today()
         return {
             "license_category": "Halle",
             "license_type": "DK",
-            "license_since": datetime.today(),
-            "license_expire": datetime(year=datetime.today().year + 1, month=datetime.today().month,
-                                       day=datetime.today().day),
+            "license_since": today,
+            "license_expire": datetime(year=today.year + 1, month=today.month, day=today.day),
             "club": self.clubname,
             "wants_higher_license": False,
             "help_count": 0,
@@ -103,14 +147,15 @@ class PersonContainer(DataContainer):
             "receives_mail_notification": True,
         }
 
-    def update(self, df=None, columns=None, keep_persons=True, save_deleted_entries=True):
+    def update(self, df=None, columns=None, keep_persons=True, save_deleted_entries=True, return_updated=False):
         """
         Updates the currently loaded persons_df with the provided df. This may also add persons/row but not columns. Default values will get inserted if not specified within columns of df.
         :param df: df with columns last_name, first_name and birthday as well as all data columns that should overwrite a person's data. Default: scalp data
         :param columns: the data columns on which data gets changed.
         :param keep_persons: if false, every person not included in the provided df will get removed from persons_df.
         :param save_deleted_entries: if true, saves removed persons/entries in a temporary file.
-        :return: Nothing.
+        :param return_updated: if true, returns the inserted/overwritten rows with all data columns.
+        :return: the inserted/overwritten rows if return_updated is set (None when df was empty), else nothing.
         """
 
         keys = ['last_name', 'first_name', 'birthday']
@@ -120,7 +165,7 @@ class PersonContainer(DataContainer):
             df = self.scalper.get_licenses()
 
         if df.empty:
-            return
+            return None
 
         df = self.validate_data(df)
 
@@ -135,10 +180,25 @@ class PersonContainer(DataContainer):
         merged_df = pd.merge(self.data, df[keys + columns_to_update],
                              on=keys, how='outer', suffixes=('', '_update'), indicator=True)
 
-        # Update the specified columns if the value in df is not null, for existing columns only
-        for column in columns_to_update:
-            condition = ~merged_df[column + '_update'].isna()
-            merged_df.loc[condition, column] = merged_df.loc[condition, column + '_update']
+        # Update the specified columns if the value in df is not null, for existing columns only;
+        # combine_first does all columns in one aligned pass instead of a mask per column
+        update_columns = [column + '_update' for column in columns_to_update]
+        merged_df[columns_to_update] = merged_df[update_columns].set_axis(columns_to_update, axis=1) \
+            .combine_first(merged_df[columns_to_update])
+
+        # Insert default values for newly added rows, provided data will not get overwritten;
+        # done on merged_df before any filtering so only actually-missing cells get written
+        mask = merged_df['_merge'] == 'right_only'
+        for column, default in self._get_data_defaults().items():
+            if column in merged_df.columns:
+                selection = mask & merged_df[column].isna()
+                if selection.any():
+                    merged_df.loc[selection, column] = default
+
+        # rows actually touched by df, captured while the merge indicator is still around
+        updated_rows = None
+        if return_updated:
+            updated_rows = merged_df.loc[merged_df['_merge'] != 'left_only', original_columns]
 
         if not keep_persons:
             # Keep only those rows that are found in df
@@ -148,24 +208,18 @@ class PersonContainer(DataContainer):
                 backup = self.data[merged_df['_merge'] == 'left_only'].copy()
                 if not backup.empty:
                     backup.sort_values(by=["last_name", "first_name"], ascending=True, inplace=True)
-                    backup.to_csv(save_path, index=False, encoding="utf_8_sig")
-                    logging.info(f"saved deleted persons ({len(backup)}) in file {save_path}")
+                    save_csv(backup, save_path)
+                    logger.info("saved deleted persons (%d) in file %s", len(backup), save_path)
 
             self.data = merged_df[merged_df['_merge'].isin(['both', 'right_only'])]
         else:
             self.data = merged_df
 
-        # Insert default values for newly added rows, provided data will not get overwritten
-        mask = merged_df['_merge'] == 'right_only'
-        subset = self.data.loc[mask]
-        data_defaults = self._get_data_defaults()
-        filled_subset = subset.fillna(data_defaults)
-
-        self.data.loc[mask] = filled_subset
-
-        # Drop the temporary update columns and the _merge indicator, sort the table for readability
-        self.data = self.data[original_columns].copy()
-        self.data.sort_values(by=["last_name", "first_name"], ascending=True, inplace=True)
+        # Drop the temporary update columns and the _merge indicator, sort the table for readability;
+        # sort_values materializes the selection itself, no separate copy needed
+        self.data = self.data[original_columns].sort_values(by=["last_name", "first_name"], ascending=True,
+                                                            kind="mergesort", ignore_index=True)
+        return updated_rows
 
     def update_membership(self, df=None):
         """
@@ -173,7 +227,6 @@ class PersonContainer(DataContainer):
         :param df: None or df with columns last_name, first_name, birthday, club_membership_expire (may have null entries)
         :return:
         """
-        df = df.copy()
         today = date.today()
         # Determine the current and previous timeframes based on today's date
         if today.month <= 6:
@@ -185,20 +238,50 @@ class PersonContainer(DataContainer):
             current_timeframe_end = date(today.year + 1, 1, 31)
             previous_timeframe_end = date(today.year, 6, 30)
 
-        if df is not None:
-            # ensure that df columns are datetime objects
-            df["birthday"] = pd.to_datetime(df["birthday"])
-            df["club_membership_expire"] = pd.to_datetime(df["club_membership_expire"])
-
-        self.data["club_membership_expire"] = self.data.apply(update_club_membership_expire, axis=1, df=df,
-                                                              current_timeframe_end=current_timeframe_end,
-                                                              previous_timeframe_end=previous_timeframe_end)
-        logging.info(
-            f"updated club_membership_expire of all loaded persons (current_timeframe_end = {current_timeframe_end}, previous_timeframe_end = {previous_timeframe_end})")
-
-    def get_club_members(self):
+        keys = ["last_name", "first_name", "birthday"]
+
+        if df is not None and not df.empty:
+            # the caller's frame stays read-only; the converted keys and expire dates live
+            # in locals, to_datetime returns new series anyway
+            df_keys = df[["last_name", "first_name"]].assign(birthday=pd.to_datetime(df["birthday"]))
+            df_expire = pd.to_datetime(df["club_membership_expire"])
+
+            # one row per person, aligned to self.data through a positional key lookup
+            unique_mask = ~df_keys.duplicated()
+            member_index = pd.MultiIndex.from_frame(df_keys[unique_mask])
+            positions = member_index.get_indexer(pd.MultiIndex.from_frame(self.data[keys]))
+            in_df = positions >= 0
+            member_values = df_expire[unique_mask].to_numpy(dtype="datetime64[ns]")
+            new_values = member_values[positions.clip(min=0)]
+            new_values[~in_df] = np.datetime64("NaT")
+        else:
+            in_df = np.zeros(len(self.data), dtype=bool)
+            new_values = np.full(len(self.data), np.datetime64("NaT"), dtype="datetime64[ns]")
+
+        current_values = pd.to_datetime(self.data["club_membership_expire"]).to_numpy(dtype="datetime64[ns]")
+        current_end = np.datetime64(pd.Timestamp(current_timeframe_end))
+        previous_end = np.datetime64(pd.Timestamp(previous_timeframe_end))
+
+        # persons in the member list take the list's date (or current_timeframe_end if the list
+        # has none); persons not in the list get capped at previous_timeframe_end unless an
+        # earlier expiring date is already known
+        keep_current = ~np.isnat(current_values) & (current_values <= previous_end)
+        self.data["club_membership_expire"] = np.select(
+            [in_df & np.isnat(new_values), in_df, keep_current],
+            [current_end, new_values, current_values],
+            default=previous_end)
+        self._invalidate_caches()
+
+        logger.info(
+            "updated club_membership_expire of all loaded persons (%d found in member list, "
+            "current_timeframe_end = %s, previous_timeframe_end = %s)",
+            int(in_df.sum()), current_timeframe_end, previous_timeframe_end)
+
+    def get_club_members(self, now=None):
+        if now is None:
+            now = datetime.now()
         return self.data[
-            (self.data["club_membership_expire"] >= datetime.now()) | self.data["club_membership_expire"].isna()]
+            (self.data["club_membership_expire"] >= now) | self.data["club_membership_expire"].isna()]
 
     def get_persons_by_license(self, license_category: str, license_type: Union[str, list[str]], only_club_members=True, max_expire_offset=None,
                                wants_higher_license: Union[None, True, False] = None, treat_expired_as_type_dk=True):
@@ -212,31 +295,38 @@ class PersonContainer(DataContainer):
         :param treat_expired_as_type_dk: Should we treat expired licenses as type DK?
         :return: all persons with the given filters applied.
         """
-        if only_club_members:
-            df = self.get_club_members()
+        now = datetime.now()
+
+        if isinstance(license_type, str) and not (treat_expired_as_type_dk and license_type == "DK"):
+            # fast path: direct hash lookup instead of scanning the whole table with boolean masks
+            positions = self._get_license_index().get((license_category, license_type))
+            df = self.data.iloc[positions] if positions is not None else self.data.head(0)
+            if only_club_members:
+                df = df[(df["club_membership_expire"] >= now) | df["club_membership_expire"].isna()]
         else:
-            df = self.data
+            if only_club_members:
+                df = self.get_club_members(now=now)
+            else:
+                df = self.data
 
-        df = df[df["license_category"] == license_category]
+            df = df[df["license_category"] == license_category].copy()
 
-        # include expired licenses as DK if necessary
-        if treat_expired_as_type_dk and license_type == "DK":
-            expired_licenses = df[df["license_expire"] <= datetime.now()].copy()
-            expired_licenses["license_expire"] = pd.NaT
-            expired_licenses["license_type"] = "DK"
-            expired_licenses["wants_higher_license"] = True
-            df.update(expired_licenses)
+            # include expired licenses as DK if necessary
+            if treat_expired_as_type_dk and license_type == "DK":
+                expired = df["license_expire"] <= now
+                df.loc[expired, "license_expire"] = pd.NaT
+                df.loc[expired, "license_type"] = "DK"
+                df.loc[expired, "wants_higher_license"] = True
 
-        if isinstance(license_type, list):
-            df = df[df["license_type"].isin(license_type)]
-        else:
-            df = df[df["license_type"] == license_type]
+            if isinstance(license_type, list):
+                df = df[df["license_type"].isin(license_type)]
+            else:
+                df = df[df["license_type"] == license_type]
 
-        time = datetime.now()
         if max_expire_offset is not None:
-            df = df[df["license_expire"].isna() | ((df["license_expire"] >= time - max_expire_offset) & (df["license_expire"] <= time + max_expire_offset))]
+            df = df[df["license_expire"].isna() | ((df["license_expire"] >= now - max_expire_offset) & (df["license_expire"] <= now + max_expire_offset))]
         else:
-            df = df[df["license_expire"].isna() | (df["license_expire"] >= time)]
+            df = df[df["license_expire"].isna() | (df["license_expire"] >= now)]
 
         if wants_higher_license is not None:
             df = df[df["wants_higher_license"]]
@@ -254,55 +344,10 @@ class PersonContainer(DataContainer):
         keys = ['last_name', 'first_name', 'birthday']
         df = df.drop_duplicates(subset=keys, ignore_index=True)
 
-        data = self.data.set_index(keys)
-        df = df.set_index(keys)
-
-        data.loc[df.index, 'failed_higher_license_count'] += 1
-        self.data = data.reset_index()
-
-
-def update_club_membership_expire(row, df, current_timeframe_end, previous_timeframe_end):
-    """
-    Update the club_membership_expire date with pandas apply function.
-    :param row: current row (needed for apply)
-    :param df: None or list of members provided by the club containing attributes/columns LAST_NAME, FIRST_NAME, BIRTHDATE, CLUB_MEMBERSHIP_EXPIRE (may have null entries). Umlaute are expected to be transformed.
-    :param current_timeframe_end: end of the current timeframe for membership cancellations
-    :param previous_timeframe_end: end of the previous timeframe for membership cancellations
-    :return: If person in df, then updated value (value in df or (if not present) current_timeframe_end). If person is not in df, already present value in dataframe or (if not present) previous_timeframe_end.
-    """
-    # df should be the list of members provided by the club.
-    # Check if the person is in df
-
-    name = row["last_name"] + ", " + row["first_name"]
-    current_val = row["club_membership_expire"]
-
-    if df is not None and ((df["last_name"] == row["last_name"]) &
-                           (df["first_name"] == row["first_name"]) &
-                           (df["birthday"] == row["birthday"])).any():
-
-        # Person is in df, check for null club_membership_expire in df
-        person_df = df[(df["last_name"] == row["last_name"]) &
-                       (df["first_name"] == row["first_name"]) &
-                       (df["birthday"] == row["birthday"])]
-
-        if pd.isnull(person_df["club_membership_expire"].iloc[0]):
-            # If club_membership_expire is null in df, set to end of current timeframe
-            logging.debug(f"updated club_membership_expire of {name} "
-                          f"from {current_val} to {current_timeframe_end} because there was no expiring date in club's member list.")
-            return current_timeframe_end
-        else:
-            # If not null, update club_membership_expire
-            new_val = person_df["club_membership_expire"].iloc[0]
-            logging.debug(f"updated club_membership_expire of {name} "
-                          f"from {current_val} to {new_val} (club member list data).")
-            return person_df["club_membership_expire"].iloc[0]
-    else:
-        # Person is not in df, check if club_membership_expire should be updated
-        if pd.isnull(row["club_membership_expire"]) or (row["club_membership_expire"] > previous_timeframe_end):
-            logging.debug(
-                f"updated club_membership_expire of {name} "
-                f"from {current_val} to {previous_timeframe_end} because he/she was not included in the club's member list.")
-            return previous_timeframe_end
-        else:
-            # If club_membership_expire is earlier, do nothing
-            return row["club_membership_expire"]
+        # resolve the rows positionally instead of rebuilding the frame around a key index;
+        # unknown persons (indexer -1) are skipped instead of raising
+        positions = pd.MultiIndex.from_frame(self.data[keys]).get_indexer(pd.MultiIndex.from_frame(df[keys]))
+        positions = positions[positions >= 0]
+        column_position = self.data.columns.get_loc('failed_higher_license_count')
+        self.data.iloc[positions, column_position] += 1
+        self._invalidate_caches()
@@ -15,7 +15,9 @@
 
 import logging
 from datetime import datetime
+from functools import cache
 
+import numpy as np
 import pandas as pd
 
 from data.BVVScalper_py import BVVScalper
@@ -26,14 +28,17 @@ from data.DataContainer_py import DataContainer
 class RegistrationContainer(DataContainer):
 
     @classmethod
+    @cache
     def get_subfolder_name(cls):
         return "courses"
 
     @classmethod
+    @cache
     def get_data_csv_name(cls):
         return "registrations_data"
 
     @classmethod
+    @cache
     def get_data_types(cls):
         return {
             "course_id": str,  # must be provided by courseContainer
@@ -48,18 +53,25 @@ class RegistrationContainer(DataContainer):
             "status": str,  # added, changed, unchanged, removed (must be set to changed by user in order to detect confirmation_status changes)
         }
 
+    _CONF_CATS = ["confirmed", "denied", "pending"]
+
     def _get_data_defaults(self):
         return {
             "confirmation_status": "pending",
             "status": "unchanged"
         }
 
+    @classmethod
+    def _normalize_confirmation_status(cls, series):
+        # categorical set_categories drops out-of-set values to NaN in one pass,
+        # masks on the column then compare integer codes instead of strings
+        return series.astype("category").cat.set_categories(cls._CONF_CATS).fillna("pending")
+
     def validate_data(self, df=None):
         df = super().validate_data(df)
         # df = replace_umlaute(df, columns=["last_name", "first_name"])
         if "confirmation_status" in df.columns:
-            mask = ~df["confirmation_status"].isin(["confirmed", "denied", "pending"])
-            df.loc[mask, "confirmation_status"] = "pending"
+            df["confirmation_status"] = self._normalize_confirmation_status(df["confirmation_status"])
 
         logging.debug("finished validating of data.")
         return df
@@ -69,9 +81,9 @@ class RegistrationContainer(DataContainer):
         return
 
     def save(self):
-        self.data = self.data[self.data["status"] != "removed"]
+        self.data = self.data.loc[self.data["status"] != "removed"].reset_index(drop=True)
         self.data.loc[:, "status"] = self._get_data_defaults()["status"]
-        self.data.loc[~self.data["confirmation_status"].isin(["confirmed", "denied", "pending"]), "confirmation_status"] = "pending"
+        self.data["confirmation_status"] = self._normalize_confirmation_status(self.data["confirmation_status"])
 
         # sort data
         self.data = self.data.sort_values(by=["course_id", "course_label", "registration_status", "participation_status", "waiting_position", "last_name", "first_name"])
@@ -92,13 +104,23 @@ class RegistrationContainer(DataContainer):
         # rename according to registrations' naming conventions
         courses = courses.rename(columns={"id": "course_id", "label": "course_label"})
 
+        # share one categorical dtype for the join key so the merge compares integer codes
+        label_dtype = pd.CategoricalDtype(
+            pd.concat([self.data["course_label"], courses["course_label"]]).dropna().unique())
+        courses = courses.astype({"course_label": label_dtype})
+
         # merge on course_label/label, delete every registration where no course is found
-        merged_df = self.data.merge(right=courses, how='inner', on="course_label", suffixes=("", "_right"))
+        merged_df = self.data.astype({"course_label": label_dtype}).merge(
+            right=courses, how='inner', on="course_label", suffixes=("", "_right"), sort=False)
 
         # replace old course_id with new one
         merged_df = merged_df.drop(columns=["course_id"])
         merged_df = merged_df.rename(columns={"course_id_right": "course_id"})
 
+        # back to plain strings; the categories are unordered so sorts would otherwise
+        # follow appearance order instead of lexicographic order
+        merged_df["course_label"] = merged_df["course_label"].astype(str)
+
         if size_before != len(merged_df):
             logging.info("removed registrations when inserting course data.")
 
@@ -133,14 +155,16 @@ class RegistrationContainer(DataContainer):
 
         # need to remove as many exact cancelled registrations as in self.data (this removes already known cancelled registrations, but not new ones)
         old_cancelled_registrations = self.data.loc[self.data["registration_status"] == "cancelled"].copy()
-        old_counts = old_cancelled_registrations[df.columns.tolist()].value_counts().to_dict()
-        for row, count in old_counts.items():
-            for _ in range(count):
-                # Find the index to be removed
-                idx = df[(df == row).all(axis=1)].index
-                if idx.empty:
-                    break
-                df = df.drop(idx[0])
+        cancelled_columns = old_cancelled_registrations.columns.tolist()
+        df_columns = df.columns.tolist()
+        if not old_cancelled_registrations.empty:
+            old_counts = old_cancelled_registrations[df_columns].value_counts()
+
+            # rank identical rows in df, then keep only occurrences beyond the known count
+            occurrence = df.groupby(df_columns, sort=False, dropna=False).cumcount()
+            known_counts = pd.Series(pd.MultiIndex.from_frame(df[df_columns]).map(old_counts),
+                                     index=df.index).fillna(0)
+            df = df[occurrence >= known_counts]
 
         # Merge with indicator
         merged_df = pd.merge(old_not_cancelled_registrations, df[keys + columns_to_update],
@@ -151,18 +175,16 @@ class RegistrationContainer(DataContainer):
                                                                | (merged_df["registration_status"] != merged_df["registration_status_update"])
                                                                | (merged_df["status"] == "changed"))
 
-        # Update the specified columns if the value in df is not null, for existing columns only
-        for column in columns_to_update:
-            condition = ~merged_df[column + '_update'].isna()
-            merged_df.loc[condition, column] = merged_df.loc[condition, column + '_update']
-
-        # Drop the temporary update columns, table already sorted by keys
-        merged_df.drop(columns=[col + '_update' for col in columns], inplace=True)
+        # Update the specified columns if the value in df is not null, for existing columns only;
+        # combine_first does all columns in one aligned pass instead of a mask per column
+        update_columns = [column + '_update' for column in columns_to_update]
+        merged_df[columns_to_update] = merged_df[update_columns].set_axis(columns_to_update, axis=1) \
+            .combine_first(merged_df[columns_to_update])
 
         # Flag old_cancelled_registrations as both to determine newly_added_condition correctly
         if len(old_cancelled_registrations) != 0:
-            common_rows = merged_df.merge(old_cancelled_registrations, on=old_cancelled_registrations.columns.tolist(), how="inner")
-            merged_df['_merge'] = merged_df.apply(lambda row: 'both' if ((row[old_cancelled_registrations.columns.tolist()] == common_rows[old_cancelled_registrations.columns.tolist()]).all(axis=1)).any() else row['_merge'], axis=1)
+            common_rows = merged_df.reset_index().merge(old_cancelled_registrations, on=cancelled_columns, how="inner")
+            merged_df.loc[merged_df.index.isin(common_rows["index"]), '_merge'] = 'both'
         newly_added_condition = (merged_df['_merge'] == 'right_only')
 
         to_be_removed_condition = (merged_df["_merge"] == "left_only")
@@ -170,20 +192,36 @@ class RegistrationContainer(DataContainer):
         # Set confirmation_status for any newly added registrations
         merged_df.loc[newly_added_condition & (merged_df["participation_status"] == "pending"), "confirmation_status"] = "pending"
 
-        merged_df = merged_df.drop(columns=['_merge'])
+        # Drop the temporary update columns and the indicator in one go, table already sorted by keys
+        merged_df.drop(columns=[col + '_update' for col in columns] + ['_merge'], inplace=True)
 
-        merged_df["status"] = "unchanged"
-        merged_df.loc[changed_condition, "status"] = "changed"
-        merged_df.loc[newly_added_condition, "status"] = "added"
-        merged_df.loc[to_be_removed_condition, "status"] = "removed"
+        # one pass over the column; the conditions are mutually exclusive, removed/added
+        # come from the merge indicator while changed only applies to matched rows
+        merged_df["status"] = np.select(
+            [to_be_removed_condition, newly_added_condition, changed_condition],
+            ["removed", "added", "changed"],
+            default="unchanged")
 
-        # add old registrations again
+        # add old registrations again; reindex so the result has no duplicate index labels
         old_cancelled_registrations["status"] = "unchanged"
-        merged_df = pd.concat([merged_df, old_cancelled_registrations])
+        merged_df = pd.concat([merged_df, old_cancelled_registrations], ignore_index=True)
 
         self.data = merged_df
         return
 
+    def set_participation_status(self, index, value):
+        """
+        Sets participation_status in place for the given row labels.
+        :param index: row labels into self.data.
+        :param value: the status to write.
+        :return: Nothing.
+        """
+        if len(index) == 0:
+            return
+        self.data.loc[index, "participation_status"] = value
+        self._invalidate_caches()
+        return
+
     def _get_by_status(self, status):
         return self.data[self.data["status"] == status]
 
@@ -13,8 +13,61 @@
 #      You should have received a copy of the GNU General Public License
 #      along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import codecs
 import logging
 
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.csv
+except ImportError:
+    # optional dependency, the plain pandas writer is used when missing
+    pyarrow = None
+
+
+def save_csv(df, path, encoding="utf-8-sig"):
+    """
+    Saves df to a csv file without the index, using the pyarrow csv writer when available.
+    :param df: the dataframe to save.
+    :param path: target file path.
+    :param encoding: output encoding. Default writes a UTF-8 BOM for Excel compatibility.
+    :return: Nothing.
+    """
+    if pyarrow is not None:
+        try:
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        except (pyarrow.lib.ArrowInvalid, ValueError, TypeError):
+            # mixed object columns pyarrow cannot infer, use the pandas writer
+            table = None
+        if table is not None:
+            with open(path, "wb") as sink:
+                if codecs.lookup(encoding).name == "utf-8-sig":
+                    sink.write(codecs.BOM_UTF8)
+                pyarrow.csv.write_csv(table, sink)
+            return
+
+    df.to_csv(path, index=False, encoding=encoding)
+
+# single-pass translation table, much cheaper than one regex per replacement
+_UMLAUT_TABLE = str.maketrans({
+    'ä': 'ae',
+    'ö': 'oe',
+    'ü': 'ue',
+    'Ä': 'Ae',
+    'Ö': 'Oe',
+    'Ü': 'Ue',
+    'ß': 'ss'
+})
+
+
+def _translate_umlaute(series):
+    if not (pd.api.types.is_string_dtype(series) or series.dtype == object):
+        return series
+    translated = series.str.translate(_UMLAUT_TABLE)
+    # str.translate turns non-string values into NaN, keep the originals there
+    return translated.where(translated.notna(), series)
+
 
 def replace_umlaute(df, columns=None, inplace=False):
     """
@@ -24,25 +77,20 @@ def replace_umlaute(df, columns=None, inplace=False):
     :param inplace: If True, performs operation inplace and returns None.
     :return: Object after replacement.
     """
-    replacements = {
-        'ä': 'ae',
-        'ö': 'oe',
-        'ü': 'ue',
-        'Ä': 'Ae',
-        'Ö': 'Oe',
-        'Ü': 'Ue',
-        'ß': 'ss'
-    }
-
-    if columns is not None:
-        if inplace:
-            gf = df
-        else:
-            gf = df.copy()
-        gf[columns] = gf[columns].replace(replacements, regex=True)
-        return gf
-
-    return df.replace(replacements, regex=True, inplace=inplace)
+    if inplace:
+        gf = df
+    else:
+        gf = df.copy()
+
+    if columns is None:
+        columns = gf.columns
+
+    for column in columns:
+        gf[column] = _translate_umlaute(gf[column])
+
+    if inplace:
+        return None
+    return gf
 
 
 def remove_duplicates(df, subset=None, save_path_duplicates=None):
@@ -53,23 +101,25 @@ def remove_duplicates(df, subset=None, save_path_duplicates=None):
     :param save_path_duplicates: save path of csv file for all detected duplicates.
     :return: df without duplicates that had the most NA values.
     """
-    gf = df.copy()
-
     if subset is None:
         subset = ["last_name", "first_name", "birthday"]
 
     ascending = [True] * len(subset) + [False]
 
-    gf["non_null_count"] = gf.apply(lambda row: row.count(), axis=1)  # count non-null elements in temporary column
-    gf_sorted = gf.sort_values(by=subset + ["non_null_count"], ascending=ascending)  # sort within same name by non-null count
+    # sort only a slim key frame (subset columns plus the completeness count) and gather
+    # the full frame once with the resulting order, instead of copying and sorting it all
+    keys = df[subset].copy()
+    keys["non_null_count"] = df.notna().to_numpy().sum(axis=1)  # count non-null elements per row
+    order = keys.sort_values(by=subset + ["non_null_count"], ascending=ascending).index
+    gf_sorted = df.loc[order]
 
     # save duplicates into file
     if save_path_duplicates is not None:
         gf_duplicates = gf_sorted[gf_sorted.duplicated(subset=subset, keep=False)]
         if not gf_duplicates.empty:
-            gf_duplicates.to_csv(save_path_duplicates, index=False)
+            save_csv(gf_duplicates, save_path_duplicates, encoding="utf-8")
             logging.info(f"removed duplicate persons but created a backup: {save_path_duplicates}")
 
-    # drop duplicates but keep most complete row for each person, remove tempo column
-    gf_unique = gf_sorted.drop_duplicates(subset=subset, keep="first").drop(columns=["non_null_count"])
+    # drop duplicates but keep most complete row for each person
+    gf_unique = gf_sorted.drop_duplicates(subset=subset, keep="first")
     return gf_unique
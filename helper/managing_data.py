@@ -13,8 +13,11 @@
 #      You should have received a copy of the GNU General Public License
 #      along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
 
 from data.BVVScalper_py import BVVScalper
@@ -25,89 +28,185 @@ from data.RegistrationContainer_py import RegistrationContainer
 from mailing.MailService import Mailer
 from mailing.MessageCreator import ManagementReport, ReportReason
 
+# closed vocabularies in the big registrations df; categorical columns compare by
+# integer code in all the masks below instead of hashing strings
+_ENUM_DTYPES = {
+    "status": pd.CategoricalDtype(["added", "changed", "unchanged", "removed"]),
+    "registration_status": pd.CategoricalDtype(["approved", "cancelled", "waiting"]),
+    "participation_status": pd.CategoricalDtype(["passed", "failed", "missed", "pending"]),
+    "confirmation_status": pd.CategoricalDtype(["confirmed", "denied", "pending"]),
+    "course_type": pd.CategoricalDtype(["training", "refresher"]),
+}
+
+
+# single-entry cache for get_big_registrations_df, keyed on the containers' data versions:
+# rebinding a container's data and every in-place mutator bumps its version, so any change
+# (including the person fixup inside the function itself) makes the key miss
+_big_registrations_cache = {"key": None, "value": None}
+
+# (last_name, first_name) pairs already sent to the BVV personal-data scrape this run;
+# a lookup that yielded nothing will not start succeeding within the same run
+_personal_data_fetched = set()
+
 
 def get_big_registrations_df(registration_container: RegistrationContainer, course_container: CourseContainer, person_container: PersonContainer, bvv_scalper: BVVScalper):
     """
-    Create big registrations_df
+    Create big registrations_df. The result is cached per combination of container states,
+    so back-to-back calls without container changes skip the merges and the BVV fetch.
     :param registration_container: registrations_container
     :param course_container: courses_container
     :param person_container: persons_container
     :param bvv_scalper: BVVScalper
     :return: big registrations_df with columns of registrations_df, courses_df with prefix courses_ and persons_df with prefix persons_. In addition, column 'club_member_status'
     """
+    cache_key = (registration_container.data_version, course_container.data_version, person_container.data_version)
+    if _big_registrations_cache["key"] == cache_key:
+        return _big_registrations_cache["value"]
+
     registrations_df = registration_container.data
 
-    # try to correct missing data in person_container
+    # try to correct missing data in person_container; a positional key lookup replaces
+    # the right-merge, which hashed the three key columns and materialized every person column
     registered_persons_unique = registrations_df[["last_name", "first_name", "birthday"]].drop_duplicates(ignore_index=True)
-    merged_persons = person_container.data.merge(right=registered_persons_unique, on=["last_name", "first_name", "birthday"], how="right")
-    missing_mails = merged_persons[merged_persons["mail"].isna()]
-    fetched_data = bvv_scalper.get_personal_data(missing_mails[["last_name", "first_name"]].drop_duplicates(ignore_index=True))
-    person_container.update(fetched_data)
-    if len(fetched_data) > 0:
-        # prepare for management report
-        fetched_data = fetched_data[["last_name", "first_name", "birthday"]].merge(right=person_container.data, on=["last_name", "first_name", "birthday"], how="left")
-        fetched_data = fetched_data[["last_name", "first_name", "birthday", "sex", "street", "postalcode", "city", "phone", "mobile", "mail", "club", "club_membership_expire"]]
-        ManagementReport.instance().add_registrations(fetched_data, ReportReason.CORRECTED_MISSING_DATA)
-
-    # retrieve person_df copy, insert club_member_status
-    persons_df = person_container.data.copy()
-    persons_df["club_membership_expire"] = pd.to_datetime(persons_df["club_membership_expire"])
-    persons_df["club_member_status"] = (persons_df["club_membership_expire"] >= datetime.now()) | persons_df[
-        "club_membership_expire"].isna()
-
-    # create huge dataframe including all person data and course data
-    persons_df = persons_df.add_prefix("person_", axis=1)
-    persons_df = persons_df.rename(
-        columns={"person_last_name": "last_name", "person_first_name": "first_name", "person_birthday": "birthday"})
-    registrations_df = registrations_df.merge(right=persons_df, on=["last_name", "first_name", "birthday"], how="left")
-    courses_df = course_container.data.add_prefix("course_", axis=1)
-    courses_df = courses_df.drop("course_label", axis=1)
-    registrations_df = registrations_df.merge(right=courses_df, on=["course_id"], how="left")
+    person_keys = pd.MultiIndex.from_frame(person_container.data[["last_name", "first_name", "birthday"]])
+    positions = person_keys.get_indexer(pd.MultiIndex.from_frame(registered_persons_unique))
+    found = positions >= 0
+    has_mail = np.zeros(len(positions), dtype=bool)
+    has_mail[found] = person_container.data["mail"].notna().to_numpy()[positions[found]]
+    missing_mails = registered_persons_unique[~has_mail]
+    fetch_keys = missing_mails[["last_name", "first_name"]].drop_duplicates(ignore_index=True)
+    # the scrape is the slowest step of the pipeline: skip names already tried this run
+    if len(fetch_keys) > 0 and len(_personal_data_fetched) > 0:
+        fetch_keys = fetch_keys[~pd.MultiIndex.from_frame(fetch_keys).isin(_personal_data_fetched)]
+    if len(fetch_keys) > 0:
+        fetched_data = bvv_scalper.get_personal_data(fetch_keys)
+        _personal_data_fetched.update(fetch_keys.itertuples(index=False, name=None))
+        # update hands back the affected rows directly, no second lookup merge needed
+        updated_persons = person_container.update(fetched_data, return_updated=True)
+        if updated_persons is not None and len(updated_persons) > 0:
+            # prepare for management report
+            report_columns = ["last_name", "first_name", "birthday", "sex", "street", "postalcode", "city",
+                              "phone", "mobile", "mail", "club", "club_membership_expire"]
+            ManagementReport.instance().add_registrations(updated_persons[report_columns], ReportReason.CORRECTED_MISSING_DATA)
+
+    # create huge dataframe including all person data and course data; the key-indexed
+    # person table with club_member_status is memoized on the container across calls and
+    # both merges run as index-aligned joins instead of hashing the key columns twice
+    persons_df = person_container.get_decorated()
+    registrations_df = registrations_df.join(persons_df, on=["last_name", "first_name", "birthday"], how="left")
+    courses_df = course_container.get_decorated()
+    registrations_df = registrations_df.join(courses_df, on="course_id", how="left")
+
+    for column, dtype in _ENUM_DTYPES.items():
+        if column in registrations_df.columns:
+            registrations_df[column] = registrations_df[column].astype(dtype)
+
+    # course values repeat across many registrations; as categoricals the report sorts
+    # below run on integer codes (categories are lexicographically ordered by astype)
+    for column in ("course_label", "course_city"):
+        if column in registrations_df.columns:
+            registrations_df[column] = registrations_df[column].astype("category")
+
+    # key is taken after the person fixup above so the stored entry matches the final state
+    _big_registrations_cache["key"] = (registration_container.data_version, course_container.data_version, person_container.data_version)
+    _big_registrations_cache["value"] = registrations_df
     return registrations_df
 
 
+def _slice_sort_report(management_report, df, columns, reason, rename=None, sort_columns=None):
+    """
+    Projects df onto columns, sorts stably by them and adds the result to the report.
+    The projection is rebuilt from the column arrays directly, so the report branch only
+    materializes one narrow frame instead of a projection plus a sorted copy of it.
+    :param management_report: the report to add to.
+    :param df: the branch frame.
+    :param columns: columns to keep, in order.
+    :param reason: the ReportReason for add_registrations.
+    :param rename: optional column rename mapping applied after sorting.
+    :param sort_columns: columns to sort by. Default: all of columns.
+    :return: Nothing.
+    """
+    if len(df) == 0:
+        return
+    projected = pd.DataFrame({column: df[column].to_numpy() for column in columns}, copy=False)
+    projected = projected.sort_values(sort_columns if sort_columns is not None else columns, kind="mergesort", ignore_index=True)
+    if rename is not None:
+        projected = projected.rename(columns=rename)
+    management_report.add_registrations(projected, reason)
+    return
+
+
 def manage_changed_registrations(registration_container: RegistrationContainer, course_container: CourseContainer, person_container: PersonContainer, bvv_scalper: BVVScalper):
     management_report = ManagementReport.instance()
     mailer = Mailer.instance()
 
+    now = datetime.now()
+    # datetime columns compare as raw int64 views against this, skipping per-row Timestamp boxing
+    now_i8 = np.int64(pd.Timestamp(now).value)
+
+    # mail batches are network-bound and disjoint, collect them and send concurrently at the end
+    mail_jobs = []
+
     registrations_df = get_big_registrations_df(registration_container, course_container, person_container, bvv_scalper)
 
     # filter out any entries with person_mail = nan (this means they were not in person_df or in general we have no data!)
-    registrations_no_data = registrations_df[registrations_df["person_mail"].isna()]
-    registrations_no_data = registrations_no_data[registration_container.data.columns.tolist()].sort_values(registration_container.data.columns.tolist())
-    management_report.add_registrations(registrations_no_data, ReportReason.MISSING_DATA)
+    mask_nodata = registrations_df["person_mail"].isna().to_numpy()
+    idx_nodata = registrations_df.index[mask_nodata]
+    reg_cols = registration_container.data.columns.tolist()
+    # full-column frames still only need sorting by the registration key
+    reg_sort_cols = ["course_id", "last_name", "first_name", "birthday"]
+    _slice_sort_report(management_report, registrations_df.loc[idx_nodata, reg_cols], reg_cols, ReportReason.MISSING_DATA,
+                       sort_columns=reg_sort_cols)
     # remove those registrations from container (we need to preserve the index in above operations for this!)
-    registration_container.data = registration_container.data.drop(registrations_no_data.index)
-    registrations_df = registrations_df.drop(registrations_no_data.index)
+    registration_container.data = registration_container.data.drop(idx_nodata)
+    registrations_df = registrations_df[~mask_nodata]
+
+    # reusable numpy masks over the filtered frame, computed once instead of per filter below
+    status = registrations_df["status"].to_numpy()
+    reg_status = registrations_df["registration_status"].to_numpy()
+    part_status = registrations_df["participation_status"].to_numpy()
+    club_member = registrations_df["person_club_member_status"].to_numpy(dtype=bool)
 
     # filter out registrations that are pending and can still be cancelled for none club members
-    registrations_to_be_cancelled = registrations_df[(~registrations_df["person_club_member_status"])
-                                                     & (registrations_df["registration_status"] != "cancelled")
-                                                     & (registrations_df["participation_status"] == "pending")
-                                                     & (registrations_df["course_deregistration_end"] > datetime.now())]
+    registrations_to_be_cancelled = registrations_df[~club_member
+                                                     & (reg_status != "cancelled")
+                                                     & (part_status == "pending")
+                                                     & (registrations_df["course_deregistration_end"].to_numpy(dtype="datetime64[ns]").view("i8") > now_i8)]
     columns_of_interest_report = ["course_label", "course_deregistration_end", "last_name", "first_name", "birthday", "person_club_member_status", "person_club_membership_expire"]
-    registrations_to_be_cancelled = registrations_to_be_cancelled[columns_of_interest_report]
-    registrations_to_be_cancelled = registrations_to_be_cancelled.sort_values(columns_of_interest_report)
-    registrations_to_be_cancelled = registrations_to_be_cancelled.rename(columns={"person_club_member_status": "club_member", "person_club_membership_expire": "club_membership_expire"})
-    management_report.add_registrations(registrations_to_be_cancelled, ReportReason.NOT_IN_CLUB)
+    _slice_sort_report(management_report, registrations_to_be_cancelled, columns_of_interest_report, ReportReason.NOT_IN_CLUB,
+                       rename={"person_club_member_status": "club_member", "person_club_membership_expire": "club_membership_expire"})
 
     # send cancellation mail to any removed registration, treat them as cancelled for mailing
-    removed_registrations = registrations_df[registrations_df["status"] == "removed"]
-    mailer.send_course_cancellation(removed_registrations)
+    removed_registrations = registrations_df[status == "removed"]
+    mail_jobs.append((mailer.send_course_cancellation, (removed_registrations,), {}))
     columns_of_interest_report = ["course_label", "last_name", "first_name", "birthday"]
-    removed_registrations = removed_registrations[columns_of_interest_report].sort_values(columns_of_interest_report)
-    management_report.add_registrations(removed_registrations, ReportReason.REMOVED)
+    _slice_sort_report(management_report, removed_registrations, columns_of_interest_report, ReportReason.REMOVED)
 
     # now only work on new registrations from club_members
-    changed_club_registrations = registrations_df[registrations_df["person_club_member_status"] & (registrations_df["status"].isin(["changed", "added"]))]
+    changed_club_registrations = registrations_df[club_member & ((status == "changed") | (status == "added"))]
+
+    # one hash pass over the status pair replaces a full boolean scan per branch below;
+    # dropna=False keeps rows whose scraped participation text mapped to NaN
+    group_positions = changed_club_registrations.groupby(["registration_status", "participation_status"], sort=False, observed=True, dropna=False).indices
+
+    def select_positions(positions):
+        if len(positions) == 0:
+            return changed_club_registrations.iloc[[]]
+        if len(positions) == 1:
+            return changed_club_registrations.iloc[positions[0]]
+        # restore original row order when a branch unions several groups
+        return changed_club_registrations.iloc[np.sort(np.concatenate(positions))]
+
+    def select_status(*keys):
+        return select_positions([group_positions[key] for key in keys if key in group_positions])
 
     # ===============================================================================================================
     #  course success
     # ===============================================================================================================
 
-    approved_success = changed_club_registrations[(changed_club_registrations["registration_status"] == "approved") & (changed_club_registrations["participation_status"] == "passed")]
+    approved_success = select_status(("approved", "passed"))
     for course_type in ["training", "refresher"]:
-        mailer.send_course_success(approved_success[approved_success["course_type"] == course_type], course_type)
+        mail_jobs.append((mailer.send_course_success, (approved_success[approved_success["course_type"] == course_type], course_type), {}))
 
     # set wants_higher_license for every training-successor to false
     training_successor = approved_success[approved_success["course_type"] == "training"]
@@ -117,27 +216,24 @@ def manage_changed_registrations(registration_container: RegistrationContainer,
 
     # management report
     columns_of_interest_report = ["course_type", "course_label", "last_name", "first_name", "birthday"]
-    approved_success = approved_success[columns_of_interest_report].sort_values(columns_of_interest_report)
-    management_report.add_registrations(approved_success, ReportReason.SUCCESS)
+    _slice_sort_report(management_report, approved_success, columns_of_interest_report, ReportReason.SUCCESS)
 
     # ===============================================================================================================
     #  course failed
     # ===============================================================================================================
 
-    approved_failed = changed_club_registrations[(changed_club_registrations["registration_status"] == "approved") & (changed_club_registrations["participation_status"] == "failed")]
+    approved_failed = select_status(("approved", "failed"))
 
-    # for "refresher" we want to reset the registration to pending if course is still doable
-    approved_failed.loc[(approved_failed["course_type"] == "refresher") & (approved_failed["course_date_end"] >= datetime.now()), "participation_status"] = "pending"
-    approved_failed_refresher_active = approved_failed[(approved_failed["course_type"] == "refresher") & (approved_failed["course_date_end"] >= datetime.now())]
-    approved_failed_refresher_active = approved_failed_refresher_active[registration_container.data.columns.tolist()]
-    registration_container.data.update(approved_failed_refresher_active)
+    # for "refresher" we want to reset the registration to pending if course is still doable;
+    # the row labels match the container, so one targeted write replaces DataFrame.update
+    refresher_active_mask = (approved_failed["course_type"].to_numpy() == "refresher") & (approved_failed["course_date_end"].to_numpy(dtype="datetime64[ns]").view("i8") >= now_i8)
+    registration_container.set_participation_status(approved_failed.index[refresher_active_mask], "pending")
 
-    # now manage truly failed courses
-    approved_failed = approved_failed[approved_failed["participation_status"] == "failed"]
-    mailer.send_course_fail(approved_failed)
+    # now manage truly failed courses, the negated mask replaces the status re-filter
+    approved_failed = approved_failed.loc[~refresher_active_mask]
+    mail_jobs.append((mailer.send_course_fail, (approved_failed,), {}))
     columns_of_interest_report = ["course_type", "course_label", "course_date_start", "course_date_end", "last_name", "first_name", "birthday"]
-    approved_failed = approved_failed[columns_of_interest_report].sort_values(columns_of_interest_report)
-    management_report.add_registrations(approved_failed, ReportReason.FAILED)
+    _slice_sort_report(management_report, approved_failed, columns_of_interest_report, ReportReason.FAILED)
 
     # increment failed_higher_license count
     person_container.increment_data_value(approved_failed)
@@ -146,79 +242,93 @@ def manage_changed_registrations(registration_container: RegistrationContainer,
     #  course missed
     # ===============================================================================================================
 
-    approved_missed = changed_club_registrations[(changed_club_registrations["registration_status"] == "approved") & (changed_club_registrations["participation_status"] == "missed")]
+    approved_missed = select_status(("approved", "missed"))
 
     # do separately for each confirmation_status
     approved_missed_confirmed = approved_missed[approved_missed["confirmation_status"] == "confirmed"]
-    mailer.send_course_missed(approved_missed_confirmed)
+    mail_jobs.append((mailer.send_course_missed, (approved_missed_confirmed,), {}))
     columns_of_interest_report = ["course_type", "course_label", "course_date_start", "course_date_end", "last_name", "first_name", "birthday"]
-    approved_missed_confirmed = approved_missed_confirmed[columns_of_interest_report].sort_values(columns_of_interest_report)
-    management_report.add_registrations(approved_missed_confirmed, ReportReason.MISSED_CONFIRMED)
+    _slice_sort_report(management_report, approved_missed_confirmed, columns_of_interest_report, ReportReason.MISSED_CONFIRMED)
 
     # approved_missed that should have been cancelled by management
-    approved_missed_bug = approved_missed[approved_missed["confirmation_status"].isin(["pending", "denied"])]
-    columns_of_interest_report = registration_container.data.columns.tolist()
-    approved_missed_bug = approved_missed_bug[columns_of_interest_report].sort_values(columns_of_interest_report)
-    management_report.add_registrations(approved_missed_bug, ReportReason.BUG)
+    confirmation = approved_missed["confirmation_status"].to_numpy()
+    approved_missed_bug = approved_missed[(confirmation == "pending") | (confirmation == "denied")]
+    _slice_sort_report(management_report, approved_missed_bug, reg_cols, ReportReason.BUG, sort_columns=reg_sort_cols)
 
     # ===============================================================================================================
     #  course registration cancelled
     # ===============================================================================================================
 
-    cancelled = changed_club_registrations[changed_club_registrations["registration_status"] == "cancelled"]
-    mailer.send_course_cancellation(cancelled)
+    # catch-all over every participation value like the baseline single-column filter,
+    # including NaN from unmapped BVV status text, so match on the first key only
+    cancelled = select_positions([positions for key, positions in group_positions.items() if key[0] == "cancelled"])
+    mail_jobs.append((mailer.send_course_cancellation, (cancelled,), {}))
     columns_of_interest_report = ["course_label", "last_name", "first_name", "birthday", "participation_status", "registration_status", "confirmation_status"]
-    cancelled = cancelled[columns_of_interest_report].sort_values(columns_of_interest_report)
-    management_report.add_registrations(cancelled, ReportReason.CANCELLED)
+    _slice_sort_report(management_report, cancelled, columns_of_interest_report, ReportReason.CANCELLED)
 
     # ===============================================================================================================
     #  course registration pending
     # ===============================================================================================================
 
-    pending = changed_club_registrations[changed_club_registrations["registration_status"].isin(["waiting", "approved"]) & (changed_club_registrations["participation_status"] == "pending")]
+    pending = select_status(("waiting", "pending"), ("approved", "pending"))
 
-    # treat online refresher differently
-    pending_refresher_online = pending[(pending["course_type"] == "refresher") & (pending["course_city"] == "Online")]
-    mailer.send_course_confirmed(pending_refresher_online, refresher_online=True)
+    # treat online refresher differently; the remainder is just the negated mask
+    online_mask = ((pending["course_type"] == "refresher") & (pending["course_city"] == "Online")).to_numpy()
+    pending_refresher_online = pending[online_mask]
+    mail_jobs.append((mailer.send_course_confirmed, (pending_refresher_online,), {"refresher_online": True}))
     if len(pending_refresher_online) > 0:
         management_report.add_general_info(f"{len(pending_refresher_online)} people received online refresher mails.")
 
-    pending = pending[(pending["course_type"] != "refresher") | (pending["course_city"] != "Online")]
+    pending = pending[~online_mask]
 
-    # confirmation denied
-    pending_confirmation_denied = pending[pending["confirmation_status"] == "denied"]
-    # mailing is done when registration is cancelled
+    # the three confirmation branches report the same columns in the same order,
+    # so sort once (stable) and let each branch slice the sorted frame
     columns_of_interest_report = ["course_label", "course_registration_end", "course_reregistration_end",
                                   "course_deregistration_end", "last_name", "first_name", "birthday",
                                   "registration_status"]
-    pending_confirmation_denied = pending_confirmation_denied[columns_of_interest_report].sort_values(columns_of_interest_report)
+    pending_sorted = pending.sort_values(columns_of_interest_report, kind="mergesort")
+
+    # confirmation denied
+    # mailing is done when registration is cancelled
+    pending_confirmation_denied = pending_sorted.loc[pending_sorted["confirmation_status"] == "denied", columns_of_interest_report]
     management_report.add_registrations(pending_confirmation_denied, ReportReason.CONFIRMATION_DENIED)
 
     # confirmation confirmed
-    pending_confirmation_confirmed = pending[pending["confirmation_status"] == "confirmed"]
-    mailer.send_course_confirmed(pending_confirmation_confirmed)
-    columns_of_interest_report = ["course_label", "course_registration_end", "course_reregistration_end",
-                                  "course_deregistration_end", "last_name", "first_name", "birthday",
-                                  "registration_status"]
-    pending_confirmation_confirmed = pending_confirmation_confirmed[columns_of_interest_report].sort_values(columns_of_interest_report)
-    management_report.add_registrations(pending_confirmation_confirmed, ReportReason.CONFIRMATION_CONFIRMED)
+    pending_confirmation_confirmed = pending_sorted[pending_sorted["confirmation_status"] == "confirmed"]
+    mail_jobs.append((mailer.send_course_confirmed, (pending_confirmation_confirmed,), {}))
+    management_report.add_registrations(pending_confirmation_confirmed[columns_of_interest_report], ReportReason.CONFIRMATION_CONFIRMED)
 
     # confirmation pending
-    pending_confirmation_pending = pending[pending["confirmation_status"] == "pending"]
-    mailer.send_course_confirmation_request(pending_confirmation_pending)
-    columns_of_interest_report = ["course_label", "course_registration_end", "course_reregistration_end",
-                                  "course_deregistration_end", "last_name", "first_name", "birthday",
-                                  "registration_status"]
-    pending_confirmation_pending = pending_confirmation_pending[columns_of_interest_report].sort_values(columns_of_interest_report)
-    management_report.add_registrations(pending_confirmation_pending, ReportReason.CONFIRMATION_PENDING)
+    pending_confirmation_pending = pending_sorted[pending_sorted["confirmation_status"] == "pending"]
+    mail_jobs.append((mailer.send_course_confirmation_request, (pending_confirmation_pending,), {}))
+    management_report.add_registrations(pending_confirmation_pending[columns_of_interest_report], ReportReason.CONFIRMATION_PENDING)
+
+    # drop batches whose frame ended up empty, there is nothing to send for them
+    mail_jobs = [(fn, args, kwargs) for fn, args, kwargs in mail_jobs if len(args[0]) > 0]
+
+    # report entries stay on this thread, only the SMTP batches run in parallel
+    if len(mail_jobs) > 0:
+        with ThreadPoolExecutor(max_workers=min(4, len(mail_jobs))) as executor:
+            futures = [executor.submit(fn, *args, **kwargs) for fn, args, kwargs in mail_jobs]
+            for future in futures:
+                future.result()
     return
 
 
 def manage_new_courses(config, new_courses: pd.DataFrame, person_container: PersonContainer):
     # only need to do management report, mailing is done by manage_registrations...
 
+    # the CT/CP blocks repeat queries from the loops above them, so memoize per argument tuple
+    @lru_cache(maxsize=None)
+    def get_candidates(license_type, wants_higher_license=None, max_expire_offset=None, treat_expired_as_type_dk=True):
+        return person_container.get_persons_by_license(license_category="Halle", license_type=license_type,
+                                                       wants_higher_license=wants_higher_license,
+                                                       max_expire_offset=max_expire_offset,
+                                                       treat_expired_as_type_dk=treat_expired_as_type_dk)
+
     # filter for courses we can register people to
-    new_courses_active = new_courses[new_courses["registration_end"] > datetime.now()]
+    now = datetime.now()
+    new_courses_active = new_courses[new_courses["registration_end"] > now]
 
     # filter for courses in main districts
     new_courses_district = new_courses_active[new_courses_active["district"].isin(config.get(["general", "districts"]))]
@@ -232,9 +342,8 @@ def manage_new_courses(config, new_courses: pd.DataFrame, person_container: Pers
     for license_type in license_types:
         refresher = new_refresher_district[new_refresher_district["license_type"] == license_type]
         if len(refresher) > 0:
-            candidates = person_container.get_persons_by_license(license_category="Halle", license_type=license_type,
-                                                                 max_expire_offset=timedelta(days=365),
-                                                                 treat_expired_as_type_dk=False)
+            candidates = get_candidates(license_type, max_expire_offset=timedelta(days=365),
+                                        treat_expired_as_type_dk=False)
             report.add_new_courses(refresher, candidates)
 
     # trainings
@@ -245,11 +354,10 @@ def manage_new_courses(config, new_courses: pd.DataFrame, person_container: Pers
 
         trainings = new_trainings_district[new_trainings_district["license_type"] == higher_license_type]
         if len(trainings) > 0:
-            candidates = person_container.get_persons_by_license(license_category="Halle", license_type=license_type,
-                                                                 wants_higher_license=True)
+            candidates = get_candidates(license_type, wants_higher_license=True)
             # ignore wants_higher_license if no one wants it.
             if len(candidates) == 0:
-                candidates = person_container.get_persons_by_license(license_category="Halle", license_type=license_type)
+                candidates = get_candidates(license_type)
 
             candidates = candidates.sort_values("wants_higher_license", ascending=False)
             report.add_new_courses(trainings, candidates)
@@ -257,18 +365,16 @@ def manage_new_courses(config, new_courses: pd.DataFrame, person_container: Pers
     # trainings CT and CP
     trainings_ct = new_trainings_district[new_trainings_district["license_type"] == "CT"]
     if len(trainings_ct) > 0:
-        candidates = person_container.get_persons_by_license(license_category="Halle", license_type="D",
-                                                             wants_higher_license=True)
+        candidates = get_candidates("D", wants_higher_license=True)
         if len(candidates) == 0:
-            candidates = person_container.get_persons_by_license(license_category="Halle", license_type="D")
+            candidates = get_candidates("D")
             candidates = candidates.sort_values("wants_higher_license", ascending=False)
         report.add_new_courses(trainings_ct, candidates)
     trainings_cp = new_trainings_district[new_trainings_district["license_type"] == "CP"]
     if len(trainings_cp) > 0:
-        candidates = person_container.get_persons_by_license(license_category="Halle", license_type="CT",
-                                                             wants_higher_license=True)
+        candidates = get_candidates("CT", wants_higher_license=True)
         if len(candidates) == 0:
-            candidates = person_container.get_persons_by_license(license_category="Halle", license_type="D")
+            candidates = get_candidates("D")
             candidates = candidates.sort_values("wants_higher_license", ascending=False)
         report.add_new_courses(trainings_ct, candidates)
     return
@@ -286,23 +392,31 @@ def manage_pending_courses(config: Config, registration_container: RegistrationC
     mailer = Mailer.instance(config)
     big_registrations_df = get_big_registrations_df(registration_container, course_container, person_container, bvv_scalper)
 
-    # only work on registrations with pending course and pending participation status
-    pending_course_registrations = big_registrations_df[(big_registrations_df["course_date_start"] >= datetime.now())
-                                                        & (big_registrations_df["registration_status"] != "cancelled")
-                                                        & (big_registrations_df["participation_status"] == "pending")].copy()
+    now = datetime.now()
+    now_i8 = np.int64(pd.Timestamp(now).value)
 
-    for course_id in pending_course_registrations["course_id"].unique():
-        course_select = course_container.data[course_container.data["id"] == course_id]
-        registrations_select = pending_course_registrations[
-            pending_course_registrations["course_id"] == course_id].sort_values("waiting_position", ascending=True)
+    # only work on registrations with pending course and pending participation status;
+    # the date column compares as an int64 view against the precomputed now
+    pending_course_registrations = big_registrations_df[(big_registrations_df["course_date_start"].to_numpy(dtype="datetime64[ns]").view("i8") >= now_i8)
+                                                        & (big_registrations_df["registration_status"] != "cancelled").to_numpy()
+                                                        & (big_registrations_df["participation_status"] == "pending").to_numpy()]
+
+    # one hash-indexed course lookup and one groupby pass instead of a boolean scan per course
+    courses_indexed = course_container.indexed
+    pending_sorted = pending_course_registrations.sort_values("waiting_position", ascending=True)
+    management_bump_ids = []
+    player_bump_ids = []
+
+    for course_id, registrations_select in pending_sorted.groupby("course_id", sort=False):
+        course_select = courses_indexed.loc[[course_id]]
 
         # send reminder based on days before and previous reminder_count
         # management
         idx = int(course_select["management_reminder_count"].iloc[0])
         if idx < len(management_reminder_days_descending):  # if it fails -> no more reminder
-            if (course_select["deregistration_end"].iloc[0] - datetime.now()).days < management_reminder_days_descending[idx]:
-                # adjust management_reminder_count
-                course_container.data.loc[course_container.data["id"] == course_id, "management_reminder_count"] += 1
+            if (course_select["deregistration_end"].iloc[0] - now).days < management_reminder_days_descending[idx]:
+                # adjust management_reminder_count after the loop
+                management_bump_ids.append(course_id)
 
                 # add to management report
                 registrations_select_report = registrations_select[["last_name", "first_name", "birthday", "person_club_member_status", "registration_status", "participation_status",
@@ -319,9 +433,9 @@ def manage_pending_courses(config: Config, registration_container: RegistrationC
         # player
         idx = int(course_select["player_reminder_count"].iloc[0])
         if idx < len(player_reminder_days_descending):  # if it fails -> no more reminder
-            if (course_select["date_start"].iloc[0] - datetime.now()).days < player_reminder_days_descending[idx]:
-                # adjust player_reminder_count
-                course_container.data.loc[course_container.data["id"] == course_id, "player_reminder_count"] += 1
+            if (course_select["date_start"].iloc[0] - now).days < player_reminder_days_descending[idx]:
+                # adjust player_reminder_count after the loop
+                player_bump_ids.append(course_id)
 
                 # only send reminder to players with confirmation_status != denied
                 registrations_select_players = registrations_select[registrations_select["confirmation_status"] != "denied"]
@@ -333,4 +447,8 @@ def manage_pending_courses(config: Config, registration_container: RegistrationC
                     # send reminder mails to all participation pending players
                     mailer.send_course_reminder(registrations_select_players, registrations_select_players["course_type"].iloc[0], course_online=(registrations_select_players["course_city"].iloc[0] == "Online"))
 
+    # batch the counter bumps, one masked write per column instead of one per course
+    course_container.increment_reminder_counts(management_bump_ids, "management_reminder_count")
+    course_container.increment_reminder_counts(player_bump_ids, "player_reminder_count")
+
     return
@@ -27,28 +27,28 @@ from mailing.MessageCreator import ManagementReport
 
 
 def trigger_club_potential_refs(config: Config, person_container: PersonContainer, potential_refs):
-    if config.get(["club_potential_refs_settings", "remove_existing_potential_refs"]):
+    settings = config.get(["club_potential_refs_settings"])
+    if settings["remove_existing_potential_refs"]:
         person_df = person_container.data
-        person_df = person_df[person_df["license_type"] != "DK"].copy()
+        # update only reads the frame (it merges into a new one), no defensive copy needed
+        person_df = person_df[person_df["license_type"] != "DK"]
         person_container.update(person_df, keep_persons=False)
         logging.info(f"removed all license_type == DK refs.")
 
     today = datetime.today()
-    potential_refs["age"] = potential_refs['birthday'].apply(
-        lambda x: today.year - x.year - ((today.month, today.day) < (x.month, x.day))
-    )
+    birthday = pd.to_datetime(potential_refs["birthday"])
+    # subtract one year for everyone whose birthday is still ahead this year
+    before_birthday = (birthday.dt.month * 32 + birthday.dt.day) > (today.month * 32 + today.day)
+    potential_refs["age"] = today.year - birthday.dt.year - before_birthday.astype(int)
     # filter by age
-    potential_refs = potential_refs[
-        (potential_refs["age"] >= config.get(["club_potential_refs_settings", "minimum_age"]))
-        & (potential_refs["age"] <= config.get(["club_potential_refs_settings", "maximum_age"]))]
-
-    # only select new people
-    merged_persons = potential_refs.merge(right=person_container.data, on=["last_name", "first_name", "birthday"],
-                                          how="outer", suffixes=["", "_right"], indicator=True)
-    merged_persons = merged_persons.loc[merged_persons["_merge"] == "left_only"]
-    merged_persons = merged_persons.drop(
-        columns=[column for column in merged_persons.columns if "_right" in column])  # drop merged columns again
-    potential_refs = merged_persons.drop(columns=["_merge"])
+    potential_refs = potential_refs[potential_refs["age"].between(settings["minimum_age"], settings["maximum_age"])]
+
+    # only select new people; an isin on the key MultiIndex is a plain anti-join without
+    # materializing the outer merge and its duplicated right-side columns
+    key_columns = ["last_name", "first_name", "birthday"]
+    existing_keys = pd.MultiIndex.from_frame(person_container.data[key_columns])
+    candidate_keys = pd.MultiIndex.from_frame(potential_refs[key_columns])
+    potential_refs = potential_refs[~candidate_keys.isin(existing_keys)]
 
     # add potential refs to personContainer
     person_container.update(potential_refs)
@@ -86,7 +86,8 @@ def trigger_ref_search(config: Config, person_container: PersonContainer):
 
 
 def trigger_refresher_pending(config: Config, course_container: CourseContainer, person_container: PersonContainer):
+    now = datetime.now()
     courses = course_container.data
-    courses = courses[courses["district"].isin(config.get(["general", "districts"])) & (courses["type"] == "refresher") & (courses["license_category"] == "Halle") & (courses["date_end"] > datetime.now())]
+    courses = courses[courses["district"].isin(config.get(["general", "districts"])) & (courses["type"] == "refresher") & (courses["license_category"] == "Halle") & (courses["date_end"] > now)]
     manage_new_courses(config, courses, person_container)
     return
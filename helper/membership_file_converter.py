@@ -14,6 +14,7 @@
 #      along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
+import os
 
 import pandas as pd
 
@@ -39,23 +40,36 @@ def read_club_membership_file(filepath, date_format, name_converter):
         "Austritt": "club_membership_expire"
     }
 
-    keep_everything_str = {key: str for key in columns_naming.keys()}
+    # a parquet snapshot of the workbook skips the slow Excel parse on repeated runs;
+    # it is refreshed whenever the workbook is newer than the snapshot
+    snapshot_path = filepath + ".parquet"
+    df = None
+    try:
+        if os.path.getmtime(snapshot_path) >= os.path.getmtime(filepath):
+            df = pd.read_parquet(snapshot_path)
+    except (OSError, ImportError, ValueError):
+        df = None
 
-    df = pd.read_excel(filepath, sheet_name=0, usecols=columns_naming.keys(), converters=keep_everything_str)
-    df = df.rename(columns=columns_naming)
+    if df is None:
+        # read the date columns directly instead of forcing str first and reparsing afterwards
+        date_columns = ["GebDatum", "Eintritt", "Austritt"]
+        df = pd.read_excel(filepath, sheet_name=0, usecols=list(columns_naming),
+                           dtype={column: "string" for column in columns_naming if column not in date_columns},
+                           parse_dates=date_columns, date_format=date_format, engine="openpyxl")
+        df = df.rename(columns=columns_naming)
+        try:
+            df.to_parquet(snapshot_path)
+        except (ImportError, ValueError, OSError):
+            logging.debug("could not write parquet snapshot of club_membership_file.")
 
-    # parse datetime
-    date_columns = ["birthday", "club_membership_enter", "club_membership_expire"]
-    for date_column in date_columns:
-        df[date_column] = pd.to_datetime(df[date_column], format=date_format)
-
-    # convert names
-    for index, row in df.iterrows():
-        combined_name = f"{row['last_name']}, {row['first_name']}"
-        if combined_name in name_converter:
-            new_last_name, new_first_name = name_converter[combined_name].split(',')
-            df.at[index, 'last_name'] = new_last_name.strip()
-            df.at[index, 'first_name'] = new_first_name.strip()
-            logging.debug(f"NAME_CONVERTER: converted {combined_name} to {new_last_name}, {new_first_name} while reading club_membership_file.")
+    # convert names, vectorized via a combined key instead of a per-row loop
+    combined = df["last_name"].str.cat(df["first_name"], sep=", ")
+    converted = combined.map(name_converter)
+    mask = converted.notna()
+    if mask.any():
+        split = converted[mask].str.split(",", n=1, expand=True)
+        df.loc[mask, "last_name"] = split[0].str.strip()
+        df.loc[mask, "first_name"] = split[1].str.strip()
+        logging.debug("NAME_CONVERTER: converted %d names while reading club_membership_file.", int(mask.sum()))
 
     return df
@@ -15,20 +15,120 @@
 
 import logging
 import os
+import smtplib
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from email.header import Header
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
-from smtplib import SMTP
+from smtplib import SMTP, SMTPException
+from string import Formatter
 
 from data.Config import Config
 from mailing.MessageCreator import ManagementReport
 
 
+_FORMATTER = Formatter()
+
+
+def _compile_template(text):
+    """
+    Parses a format string once into its (literal, field, spec, conversion) parts,
+    so rendering a row only pays dict lookups instead of re-parsing the template.
+    :param text: the format string.
+    :return: list of parts for _render_template.
+    """
+    return list(_FORMATTER.parse(text))
+
+
+def _render_template(parts, placeholders):
+    pieces = []
+    for literal, field, spec, conversion in parts:
+        pieces.append(literal)
+        if field is not None:
+            value = placeholders[field]
+            if conversion is not None:
+                value = _FORMATTER.convert_field(value, conversion)
+            pieces.append(format(value, spec))
+    return ''.join(pieces)
+
+
+class PipelinedSMTP(SMTP):
+    """
+    SMTP client that uses ESMTP PIPELINING (RFC 2920) when the server offers it:
+    MAIL FROM, all RCPT TOs and DATA are written back-to-back and their replies are
+    read in one batch afterwards, collapsing three round trips per message into one.
+    Servers without PIPELINING get the regular synchronous sendmail.
+    """
+
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+        if mail_options or rcpt_options or not self.has_extn("pipelining"):
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+
+        if isinstance(msg, str):
+            msg = smtplib._fix_eols(msg).encode('ascii')
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+
+        # write the whole envelope without waiting for the individual replies
+        self.putcmd("mail", f"FROM:{smtplib.quoteaddr(from_addr)}")
+        for addr in to_addrs:
+            self.putcmd("rcpt", f"TO:{smtplib.quoteaddr(addr)}")
+        self.putcmd("data")
+
+        # drain the batched replies in the same order the commands were written
+        (mail_code, mail_resp) = self.getreply()
+        senderrs = {}
+        for addr in to_addrs:
+            (code, resp) = self.getreply()
+            if code not in (250, 251):
+                senderrs[addr] = (code, resp)
+        (data_code, data_resp) = self.getreply()
+
+        # the data phase was opened, so it has to be terminated before anything else
+        if data_code == 354:
+            quoted = smtplib._quote_periods(msg)
+            if quoted[-2:] != smtplib.bCRLF:
+                quoted += smtplib.bCRLF
+            quoted += b"." + smtplib.bCRLF
+            self.send(quoted)
+            (data_code, data_resp) = self.getreply()
+
+        # same error semantics as smtplib.SMTP.sendmail
+        if mail_code != 250:
+            if mail_code == 421:
+                self.close()
+            else:
+                self._rset()
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+        if len(senderrs) == len(to_addrs):
+            self._rset()
+            raise smtplib.SMTPRecipientsRefused(senderrs)
+        if data_code != 250:
+            if data_code == 421:
+                self.close()
+            else:
+                self._rset()
+            raise smtplib.SMTPDataError(data_code, data_resp)
+        return senderrs
+
+
+class PipelinedSMTPS(smtplib.SMTP_SSL, PipelinedSMTP):
+    """PipelinedSMTP over implicit TLS (SMTPS, usually port 465)."""
+
+
 class Mailer:
     __instance = None
 
+    # messages sent per SMTP connection before we reconnect (avoids server idle/session limits on big batches)
+    _SMTP_RECYCLE_AFTER = 1000
+    # never hang forever on an unresponsive server
+    _SMTP_TIMEOUT = 30
+
     @staticmethod
     def instance(config: Config = None):
         """
@@ -50,43 +150,79 @@ class Mailer:
         self.smtp_port = credentials['smtp_port']
         self.smtp_username = credentials['smtp_username']
         self.smtp_password = credentials['smtp_password']
+        # number of parallel SMTP sessions for batch sends, 5 is safe for common providers
+        self.smtp_concurrency = credentials.get('smtp_concurrency', 5)
 
         self.management_contact_name = config.get(["mail_settings", "contact_info", "name"])
         self.management_contact_mail = config.get(["mail_settings", "contact_info", "mail"])
         self.management_contact_phone = config.get(["mail_settings", "contact_info", "phone"])
 
+        # constant placeholders available to every template rendering
+        self._base_placeholders = {
+            "management_contact_name": self.management_contact_name,
+            "management_contact_mail": self.management_contact_mail,
+            "management_contact_phone": self.management_contact_phone
+        }
+
         config_path_mail_header = ["mail_settings", "mail_headers"]
         mail_template_keys = config.get(config_path_mail_header).keys()
 
+        # headers come from the already-loaded config; bodies live in one file each and most
+        # runs only use a few templates, so they are read from disk lazily on first use
+        self._mail_template_dir = os.path.join(os.getcwd(), config.get(["general", "main_folder_path"]))
         self.mail_templates = {}
-        directory = os.path.join(os.getcwd(), config.get(["general", "main_folder_path"]))
         for key in mail_template_keys:
             self.mail_templates[key] = {
-                "header": config.get(config_path_mail_header + [key]),
-                "body": Path(os.path.join(directory, f"mail_{key}.txt")).read_text(encoding='utf-8')
+                "header_parts": _compile_template(config.get(config_path_mail_header + [key]))
             }
 
         self.management_report_mail = config.get(["mail_settings", "mail_notifications", "management", "mail_to"])
 
-    def _send_mail(self, mail_to, msg_str):
-        logging.info(f"MailService: sending mail to {mail_to}")
+    @contextmanager
+    def _smtp_session(self):
+        """
+        Opens a logged-in SMTP session (ehlo/starttls/login once) and closes it afterwards.
+        Use one session for a whole batch of mails instead of reconnecting per mail.
+        :return: context manager yielding the ready-to-send SMTP connection.
+        """
+        # port 465 is implicit TLS (SMTPS): the socket is encrypted from the start,
+        # which saves the starttls round trip of the plain-then-upgrade dance
+        if self.smtp_port == 465:
+            smtp = PipelinedSMTPS(self.smtp_server, self.smtp_port, timeout=Mailer._SMTP_TIMEOUT)
+        else:
+            smtp = PipelinedSMTP(self.smtp_server, self.smtp_port, timeout=Mailer._SMTP_TIMEOUT)
+        try:
+            smtp.ehlo()
+            if not isinstance(smtp, smtplib.SMTP_SSL):
+                smtp.starttls()
+                smtp.ehlo()
+            smtp.login(self.smtp_username, self.smtp_password)
+            yield smtp
+        finally:
+            try:
+                smtp.quit()
+            except (SMTPException, OSError):
+                pass
+
+    def _send_mail_on(self, smtp, mail_to, msg_str):
+        logging.info("MailService: sending mail to %s", mail_to)
         if self.mails_only_to_management and (mail_to != self.management_report_mail):
             mail_to = self.management_report_mail
+        smtp.sendmail(self.smtp_username, mail_to, msg_str)
+        return
 
-        with SMTP(self.smtp_server, self.smtp_port) as smtp:
-            smtp.ehlo()
-            smtp.starttls()
-            smtp.ehlo()
-            smtp.login(self.smtp_username, self.smtp_password)
-            smtp.sendmail(self.smtp_username, mail_to, msg_str)
+    def _send_mail(self, mail_to, msg_str):
+        with self._smtp_session() as smtp:
+            self._send_mail_on(smtp, mail_to, msg_str)
         return
 
     def send_management_report(self, html_report):
         if html_report is None:
             logging.info("Management report has no content. Skipping mailing...")
             return
+        timestamp = datetime.today().strftime('%d.%m.%Y, %H:%M')
         msg = MIMEMultipart("alternative")
-        msg["Subject"] = f"Management Report {datetime.today().strftime('%d.%m.%Y, %H:%M')}"
+        msg["Subject"] = f"Management Report {timestamp}"
         msg["From"] = self.management_report_mail
         msg["To"] = self.management_report_mail
 
@@ -97,23 +233,76 @@ class Mailer:
         return
 
     def _send_mail_from_template(self, mail_template_key, data):
-        additional_placeholders = {
-            "management_contact_name": self.management_contact_name,
-            "management_contact_mail": self.management_contact_mail,
-            "management_contact_phone": self.management_contact_phone
-        }
+        records = data.to_dict('records')
+
+        # sending is latency-bound, so split the batch over a few parallel SMTP sessions;
+        # small batches (or smtp_concurrency <= 1) stay serial to not pay the pool overhead
+        workers = min(self.smtp_concurrency, len(records))
+        if workers <= 1:
+            self._send_template_records(mail_template_key, records)
+            return
+
+        # load the body once up front so the workers do not race to read the same file
+        self._get_body_parts(mail_template_key)
+        slices = [records[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._send_template_records, mail_template_key, records_slice)
+                       for records_slice in slices]
+            for future in futures:
+                future.result()
+
+    def _get_body_parts(self, mail_template_key):
+        """
+        Gets the compiled body parts of the given template, reading the file on first use.
+        :param mail_template_key: the template key.
+        :return: list of parts for _render_template.
+        """
+        template = self.mail_templates[mail_template_key]
+        if "body_parts" not in template:
+            body = Path(os.path.join(self._mail_template_dir, f"mail_{mail_template_key}.txt")).read_text(encoding='utf-8')
+            template["body_parts"] = _compile_template(body)
+        return template["body_parts"]
+
+    def _send_template_records(self, mail_template_key, records):
+        header_parts = self.mail_templates[mail_template_key]["header_parts"]
+        body_parts = self._get_body_parts(mail_template_key)
+
+        from_line = f"From: {self.management_report_mail}\r\n"
+
+        # render every message up front so the SMTP session only does network I/O
+        messages = []
+        for dict in records:
+            # ChainMap avoids a per-row dict merge; the base placeholders keep precedence
+            # like the previous {**row, **additional_placeholders} merge
+            placeholders = ChainMap(self._base_placeholders, dict)
+            header = _render_template(header_parts, placeholders)
+            body = _render_template(body_parts, placeholders)
+            mail_to = dict["person_mail"]
 
-        for dict in data.to_dict('records'):
-            placeholders = {**dict, **additional_placeholders}
-            header = self.mail_templates[mail_template_key]["header"].format(**placeholders)
-            body = self.mail_templates[mail_template_key]["body"].format(**placeholders)
+            # hand-assemble the plain-text message: MIMEText + as_string re-run the email
+            # package's folding/encoding machinery per mail, and their base64 body is a
+            # third bigger on the wire than 8bit utf-8
+            head = (from_line
+                    + f"To: {mail_to}\r\n"
+                    + f"Subject: {Header(header).encode()}\r\n"
+                    + "MIME-Version: 1.0\r\n"
+                    + "Content-Type: text/plain; charset=\"utf-8\"\r\n"
+                    + "Content-Transfer-Encoding: 8bit\r\n\r\n")
+            messages.append((mail_to, head.encode('ascii') + smtplib._fix_eols(body).encode('utf-8')))
 
-            msg = MIMEText(body, 'plain', 'utf-8')
-            msg['Subject'] = Header(header)
-            msg["From"] = self.management_report_mail
-            msg["To"] = dict["person_mail"]
+        if self.mails_only_to_management and len(messages) > 1:
+            # everything is redirected to the management mailbox anyway, so identical
+            # rendered messages (e.g. duplicate rows) only need to traverse the wire once
+            seen = set()
+            messages = [(mail_to, msg_bytes) for mail_to, msg_bytes in messages
+                        if msg_bytes not in seen and not seen.add(msg_bytes)]
 
-            self._send_mail(msg["To"], msg.as_string())
+        # one SMTP session per slice of the batch: the ehlo/starttls/login handshake is paid
+        # once instead of once per mail, reconnecting only every _SMTP_RECYCLE_AFTER messages
+        for start in range(0, len(messages), Mailer._SMTP_RECYCLE_AFTER):
+            with self._smtp_session() as smtp:
+                for mail_to, msg_str in messages[start:start + Mailer._SMTP_RECYCLE_AFTER]:
+                    self._send_mail_on(smtp, mail_to, msg_str)
 
     def send_course_success(self, big_registrations_df, course_type):
         self._send_mail_from_template(f"course_success_{course_type}", big_registrations_df)
@@ -13,8 +13,10 @@
 #      You should have received a copy of the GNU General Public License
 #      along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
 import logging
 from enum import unique, IntEnum
+from functools import lru_cache
 
 import pandas as pd
 
@@ -35,17 +37,26 @@ class ReportReason(IntEnum):
     CONFIRMATION_PENDING = 11,
 
 
+# column projections used when rendering the report tables
+_REMINDER_COLS = ["district", "label", "city", "date_start", "date_end", "registration_end", "reregistration_end", "deregistration_end", "free_space", "granted_space", "waiting_count"]
+_NEW_COURSE_COLS = ["district", "label", "city", "date_start", "date_end", "registration_start", "registration_end", "free_space", "granted_space", "waiting_count"]
+_NEW_COURSE_PERSON_COLS = ["last_name", "first_name", "license_category", "license_type", "license_expire", "club", "club_membership_expire", "club_team", "help_count", "failed_higher_license_count", "wants_higher_license"]
+
+
+@lru_cache(maxsize=1)
+def _management_report_singleton():
+    return ManagementReport()
+
+
 class ManagementReport:
     # singleton!
-    _instance = None
 
     _TD_ALIGNMENT = "center"
 
     @staticmethod
     def instance():
-        if ManagementReport._instance is None:
-            ManagementReport._instance = ManagementReport()
-        return ManagementReport._instance
+        # lru_cache is C-implemented and thread-safe, cheaper than a None-check per call
+        return _management_report_singleton()
 
     def __init__(self):
         self.general_info = []
@@ -54,7 +65,9 @@ class ManagementReport:
         self.suggested_persons_new_courses = []  # parallel to new_courses!
         self.course_reminder = []
         self.course_reminder_registrations = []  # parallel to course_reminder!
-        self.registrations = [pd.DataFrame() for _ in range(len(ReportReason.__members__))]
+        self.course_reminder_earliest = []  # parallel to course_reminder!
+        # one list of frames per reason, concatenated once at report-build time
+        self.registrations = [[] for _ in range(len(ReportReason.__members__))]
         return
 
     def has_content(self):
@@ -78,8 +91,9 @@ class ManagementReport:
         if len(courses) > 0:
             if len(self.new_courses) == 0:
                 self.add_to_do("We have at least one new course (see below).")
-            courses = courses.reset_index(drop=True).copy()
-            persons = persons.reset_index(drop=True).copy()
+            # reset_index already returns a new frame, no extra copy needed
+            courses = courses.reset_index(drop=True)
+            persons = persons.reset_index(drop=True)
             self.new_courses.append(courses)
             self.suggested_persons_new_courses.append(persons)
         return self
@@ -94,129 +108,129 @@ class ManagementReport:
         if len(courses) + len(registrations) > 0:
             if len(self.course_reminder) == 0:
                 self.add_to_do("There is at least one course reminder in the report (see below).")
-            courses = courses.reset_index(drop=True).copy()
-            registrations = registrations.reset_index(drop=True).copy()
+            courses = courses.reset_index(drop=True)
+            registrations = registrations.reset_index(drop=True)
             self.course_reminder.append(courses)
             self.course_reminder_registrations.append(registrations)
+            # two column-wise mins beat a row-wise reduction and only need computing once;
+            # the tiny Series.min skips an all-NaT column (builtin min would propagate NaT)
+            self.course_reminder_earliest.append(pd.Series([courses["reregistration_end"].min(), courses["deregistration_end"].min()]).min())
         return self
 
     def _add_registration(self, registrations: pd.DataFrame, reason: ReportReason):
-        self.registrations[reason.value] = pd.concat([self.registrations[reason.value], registrations], ignore_index=True)
+        # appending frames is O(1); concatenating on every call would re-copy the accumulator each time
+        self.registrations[reason.value].append(registrations)
+
+    _PERSON_KEY = ("last_name", "first_name", "birthday")
+
+    # reason -> (message template, message is a to-do (else general info), dedup subset, store the rows)
+    _REGISTRATION_HANDLERS = {
+        ReportReason.BUG: ("We have {n} bugged registrations.", True, None, True),
+        ReportReason.MISSING_DATA: ("We had {n} registrations in total with missing data (see persons below)! Try to add potential refs via the config trigger or add them manually to persons.csv! We will look at them again next run...", True, _PERSON_KEY, True),
+        ReportReason.CORRECTED_MISSING_DATA: ("We needed to correct {n} missing data (see persons below) via BVV data! Check if they are actual club members and/or if we need to add them to name converter!", True, _PERSON_KEY, True),
+        ReportReason.NOT_IN_CLUB: ("We need to cancel {n} registrations (see below).", True, None, True),
+        ReportReason.MISSED_CONFIRMED: (None, False, None, True),
+        ReportReason.FAILED: (None, False, None, True),
+        ReportReason.REMOVED: ("{n} registrations got removed due to re-registrations. Cancellation mails have been sent.", False, None, False),
+        ReportReason.SUCCESS: ("{n} players successfully participated in a course.", False, None, False),
+        ReportReason.CANCELLED: ("{n} registrations got cancelled.", False, None, False),
+        ReportReason.CONFIRMATION_CONFIRMED: ("{n} registrations got confirmed.", False, None, False),
+        ReportReason.CONFIRMATION_PENDING: ("{n} (changed) registrations have pending confirmation_status. (see below)", False, None, True),
+        ReportReason.CONFIRMATION_DENIED: ("{n} registrations were confirmation denied (see below)", False, None, True),
+    }
 
     def add_registrations(self, registrations: pd.DataFrame, reason: ReportReason):
         if len(registrations) == 0:
             return
-        if reason == ReportReason.BUG:
-            self.add_to_do(f"We have {len(registrations)} bugged registrations.")
-            self._add_registration(registrations, reason)
-        elif reason == ReportReason.MISSING_DATA:
-            self.add_to_do(f"We had {len(registrations)} registrations in total with missing data (see persons below)! Try to add potential refs via the config trigger or add them manually to persons.csv! We will look at them again next run...")
-            self._add_registration(registrations.drop_duplicates(subset=["last_name", "first_name", "birthday"]), reason)
-        elif reason == ReportReason.CORRECTED_MISSING_DATA:
-            self.add_to_do(f"We needed to correct {len(registrations)} missing data (see persons below) via BVV data! Check if they are actual club members and/or if we need to add them to name converter!")
-            self._add_registration(registrations.drop_duplicates(subset=["last_name", "first_name", "birthday"]), reason)
-        elif reason == ReportReason.NOT_IN_CLUB:
-            self.add_to_do(f"We need to cancel {len(registrations)} registrations (see below).")
-            self._add_registration(registrations, reason)
-        elif reason == ReportReason.MISSED_CONFIRMED or reason == ReportReason.FAILED:
-            self._add_registration(registrations, reason)
-        elif reason == ReportReason.REMOVED:
-            self.add_general_info(f"{len(registrations)} registrations got removed due to re-registrations. Cancellation mails have been sent.")
-        elif reason == ReportReason.SUCCESS:
-            self.add_general_info(f"{len(registrations)} players successfully participated in a course.")
-        elif reason == ReportReason.CANCELLED:
-            self.add_general_info(f"{len(registrations)} registrations got cancelled.")
-        elif reason == ReportReason.CONFIRMATION_CONFIRMED:
-            self.add_general_info(f"{len(registrations)} registrations got confirmed.")
-        elif reason == ReportReason.CONFIRMATION_PENDING:
-            self.add_general_info(f"{len(registrations)} (changed) registrations have pending confirmation_status. (see below)")
+        try:
+            message, is_to_do, dedup_subset, store = self._REGISTRATION_HANDLERS[reason]
+        except KeyError:
+            raise ValueError(f"ReportReason {reason.name} is not supported.") from None
+
+        if message is not None:
+            if is_to_do:
+                self.add_to_do(message.format(n=len(registrations)))
+            else:
+                self.add_general_info(message.format(n=len(registrations)))
+        if store:
+            if dedup_subset is not None:
+                registrations = registrations.drop_duplicates(subset=list(dedup_subset))
             self._add_registration(registrations, reason)
-        elif reason == ReportReason.CONFIRMATION_DENIED:
-            self.add_general_info(f"{len(registrations)} registrations were confirmation denied (see below)")
-            self._add_registration(registrations, reason)
-
-        else:
-            raise ValueError(f"ReportReason {reason.name} is not supported.")
 
     def get_html_message(self):
         if not self.has_content():
             logging.info("ManagementReport: Did not build a report because it had no content.")
             return None
 
-        msg = """\
+        # write everything into one growing buffer; to_html(buf=...) streams each table
+        # directly into it instead of materializing the table string first
+        buf = io.StringIO()
+        buf.write("""\
         <html>
         <style>
         table, th, td {
         border:1px solid black;
         }
+        td {
+        text-align: """ + self._TD_ALIGNMENT + """;
+        }
         tr:nth-child(even) {
             background-color: #D6EEEE;
         }
         </style>
         <body>
-        """
+        """)
 
         if len(self.to_do) > 0:
-            msg += "<h1>TO-DO</h1>"
-            for i in range(len(self.to_do)):
-                msg += f"<p>{self.to_do[i]}</p>"
+            buf.write("<h1>TO-DO</h1>")
+            for to_do in self.to_do:
+                buf.write(f"<p>{to_do}</p>")
 
         if len(self.general_info) > 0:
-            msg += "<h1>General Information</h1>"
-            for i in range(len(self.general_info)):
-                msg += f"<p>{self.general_info[i]}</p>"
+            buf.write("<h1>General Information</h1>")
+            for info in self.general_info:
+                buf.write(f"<p>{info}</p>")
 
         if len(self.course_reminder) > 0:
-            msg += "<h1>Course Reminder</h1>"
+            buf.write("<h1>Course Reminder</h1>")
             for i in range(len(self.course_reminder)):
                 courses = self.course_reminder[i]
 
-                earliest_date = courses[["reregistration_end", "deregistration_end"]].min(axis=1).min()
-                sub_msg = f"<h2>Course Reminder: We have until {earliest_date:%Y-%m-%d}</h2>"
-                sub_msg += f"<p>The registrations of the following courses can all be modified until {earliest_date:%Y-%m-%d}. Be aware that registrations that are listed below with MISSING DATA are NOT listed here!</p>"
+                earliest_date = self.course_reminder_earliest[i]
+                buf.write(f"<h2>Course Reminder: We have until {earliest_date:%Y-%m-%d}</h2>")
+                buf.write(f"<p>The registrations of the following courses can all be modified until {earliest_date:%Y-%m-%d}. Be aware that registrations that are listed below with MISSING DATA are NOT listed here!</p>")
 
-                stripped_courses = courses[["district", "label", "city", "date_start", "date_end", "registration_end", "reregistration_end", "deregistration_end", "free_space", "granted_space", "waiting_count"]]
-                sub_msg += stripped_courses.to_html(index=False, float_format='{:.0f}'.format).replace('<td>', f'<td align="{self._TD_ALIGNMENT}">')
+                courses[_REMINDER_COLS].to_html(buf=buf, index=False, float_format='{:.0f}'.format)
 
-                sub_msg += "<p>Current registrations:</p>"
-                persons = self.course_reminder_registrations[i]
-                sub_msg += persons.to_html(index=False, float_format='{:.0f}'.format).replace('<td>', f'<td align="{self._TD_ALIGNMENT}">')
+                buf.write("<p>Current registrations:</p>")
+                self.course_reminder_registrations[i].to_html(buf=buf, index=False, float_format='{:.0f}'.format)
 
-                msg += sub_msg
-
-        sub_msg = "<h1>Important Registration-Changes</h1>"
-        include_sub_msg = False
+        header_written = False
         for reason in ReportReason:
-            df = self.registrations[reason.value]
-            if not df.empty:
-                include_sub_msg = True
-                sub_msg += f"<p>Registrations: {reason.name}</p>"
-                sub_msg += df.to_html(index=False, float_format='{:.0f}'.format).replace('<td>', f'<td align="{self._TD_ALIGNMENT}">')
-
-        if include_sub_msg:
-            msg += sub_msg
+            frames = self.registrations[reason.value]
+            if frames:
+                if not header_written:
+                    buf.write("<h1>Important Registration-Changes</h1>")
+                    header_written = True
+                df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+                buf.write(f"<p>Registrations: {reason.name}</p>")
+                df.to_html(buf=buf, index=False, float_format='{:.0f}'.format)
 
         if len(self.new_courses) != 0:
-            msg += "<h1>New Courses</h1>"
+            buf.write("<h1>New Courses</h1>")
             for i in range(len(self.new_courses)):
                 courses = self.new_courses[i]
 
                 type = courses.loc[0, "type"]
                 license_category = courses.loc[0, "license_category"]
                 license_type = courses.loc[0, "license_type"]
-                sub_msg = f"<h2>New {type}: {license_category} {license_type}</h2>"
-
-                sub_msg += "<p>Available courses:</p>"
-                stripped_courses = courses[
-                    ["district", "label", "city", "date_start", "date_end", "registration_start", "registration_end", "free_space", "granted_space", "waiting_count"]]
-                sub_msg += stripped_courses.to_html(index=False, float_format='{:.0f}'.format).replace('<td>', f'<td align="{self._TD_ALIGNMENT}">')
+                buf.write(f"<h2>New {type}: {license_category} {license_type}</h2>")
 
-                sub_msg += "<p>Suggested registrations:</p>"
-                persons = self.suggested_persons_new_courses[i]
-                stripped_persons = persons[
-                    ["last_name", "first_name", "license_category", "license_type", "license_expire", "club", "club_membership_expire", "club_team", "help_count", "failed_higher_license_count", "wants_higher_license"]]
-                sub_msg += stripped_persons.to_html(index=False, float_format='{:.0f}'.format).replace('<td>', f'<td align="{self._TD_ALIGNMENT}">')
+                buf.write("<p>Available courses:</p>")
+                courses[_NEW_COURSE_COLS].to_html(buf=buf, index=False, float_format='{:.0f}'.format)
 
-                msg += sub_msg
+                buf.write("<p>Suggested registrations:</p>")
+                self.suggested_persons_new_courses[i][_NEW_COURSE_PERSON_COLS].to_html(buf=buf, index=False, float_format='{:.0f}'.format)
 
-        return msg + "</body></html>"
+        buf.write("</body></html>")
+        return buf.getvalue()
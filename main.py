@@ -89,7 +89,7 @@ def main(program_path):
 
     # insert course_id into registrations, assert deep course data
     registration_container.insert_course_id(course_container.data)
-    course_container.assert_deep_data(list(registration_container.data["course_id"]))
+    course_container.assert_deep_data(registration_container.data["course_id"].unique())
 
     # read club_members
     settings_config_path = ["club_membership_file_settings"]
@@ -100,14 +100,14 @@ def main(program_path):
 
     trigger_config_path = ["trigger", "club_potential_refs_update"]
     if config.get(trigger_config_path):
-        logging.info(f"Trigger {trigger_config_path[1]} is active.")
+        logging.info("Trigger %s is active.", trigger_config_path[1])
         config.set(trigger_config_path, False)
         potential_refs = club_members.copy()
         trigger_club_potential_refs(config, person_container, potential_refs)
 
     trigger_config_path = ["trigger", "club_membership_update"]
     if config.get(trigger_config_path):
-        logging.info(f"Trigger {trigger_config_path[1]} is active.")
+        logging.info("Trigger %s is active.", trigger_config_path[1])
         config.set(trigger_config_path, False)
         person_container.update_membership(
             club_members[["last_name", "first_name", "birthday", "club_membership_expire"]])
@@ -116,20 +116,20 @@ def main(program_path):
 
     trigger_config_path = ["trigger", "only_update_data"]
     if config.get(trigger_config_path):
-        logging.info(f"Trigger {trigger_config_path[1]} is active.")
+        logging.info("Trigger %s is active.", trigger_config_path[1])
         config.set(trigger_config_path, False)
         management_report.add_general_info("only updated data, did not send mails.")
         disable(program_path, config, containers)
 
     trigger_config_path = ["trigger", "ref_search"]
     if config.get(trigger_config_path):
-        logging.info(f"Trigger {trigger_config_path[1]} is active.")
+        logging.info("Trigger %s is active.", trigger_config_path[1])
         config.set(trigger_config_path, False)
         trigger_ref_search(config, person_container)
 
     trigger_config_path = ["trigger", "refresher_pending_in_report"]
     if config.get(trigger_config_path):
-        logging.info(f"Trigger {trigger_config_path[1]} is active.")
+        logging.info("Trigger %s is active.", trigger_config_path[1])
         config.set(trigger_config_path, False)
         trigger_refresher_pending(config, course_container, person_container)
 